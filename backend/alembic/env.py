@@ -14,6 +14,7 @@ from app.models.transcript import Transcript  # noqa: F401
 from app.models.use_case import UseCase   # noqa: F401
 from app.models.use_case_relation import UseCaseRelation  # noqa: F401
 from app.models.comment import Comment    # noqa: F401
+from app.models.extraction_cache import ExtractionCacheEntry  # noqa: F401
 from app.config import settings
 
 config = context.config
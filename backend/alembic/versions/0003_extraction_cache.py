@@ -0,0 +1,35 @@
+"""Add extraction_cache table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "extraction_cache",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("chunk_hash", sa.String(64), nullable=False),
+        sa.Column("prompt_version", sa.String(64), nullable=False),
+        sa.Column("model", sa.String(255), nullable=False),
+        sa.Column("temperature", sa.Float, nullable=False),
+        sa.Column("result", postgresql.JSON, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("chunk_hash", "prompt_version", "model", "temperature", name="uq_extraction_cache_key"),
+    )
+    op.create_index("ix_extraction_cache_prompt_version", "extraction_cache", ["prompt_version"])
+
+
+def downgrade() -> None:
+    op.drop_table("extraction_cache")
@@ -0,0 +1,40 @@
+"""Add generated full-text search vector to use_cases
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(tags::text, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "use_cases",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR,
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        ),
+    )
+    op.create_index(
+        "ix_use_cases_search_vector", "use_cases", ["search_vector"], postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_use_cases_search_vector", table_name="use_cases")
+    op.drop_column("use_cases", "search_vector")
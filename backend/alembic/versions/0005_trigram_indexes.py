@@ -0,0 +1,32 @@
+"""Add pg_trgm trigram indexes for fuzzy name search
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = (
+    ("ix_companies_name_trgm", "companies", "name"),
+    ("ix_industries_name_trgm", "industries", "name"),
+    ("ix_use_cases_title_trgm", "use_cases", "title"),
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name, table, [column], postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}
+        )
+
+
+def downgrade() -> None:
+    for name, table, _ in TRIGRAM_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -1,4 +1,4 @@
-from app.ai.chunker import chunk_transcript
+from app.ai.chunker import chunk_transcript, split_transcript
 from app.ai.chains import (
     ExtractedUseCase,
     ExtractionResult,
@@ -9,6 +9,7 @@ from app.ai.embedder import QdrantEmbedder
 
 __all__ = [
     "chunk_transcript",
+    "split_transcript",
     "ExtractedUseCase",
     "ExtractionResult",
     "create_extraction_chain",
@@ -12,7 +12,7 @@ def create_agent_tools(context: dict):
         kb = context.get("knowledge_base")
         if not kb:
             return "Knowledge base not available."
-        results = kb.search_all(query, limit=limit, company_id=company_id)
+        results = await kb.search_all(query, limit=limit, company_id=company_id)
         parts = []
         for r in results.get("transcripts", [])[:3]:
             parts.append(f"[Transcript chunk] {r['payload'].get('text', '')[:500]}...")
@@ -0,0 +1,384 @@
+"""
+Async counterpart of KnowledgeBase for the API request path (chat agent tools,
+search handlers). Uses AsyncQdrantClient and AsyncOpenAI so embedding and
+Qdrant round trips never block the event loop.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import Filter, FusionQuery, Fusion, PointStruct
+
+from app.config import settings
+from app.clients import get_async_openai_client
+from app.ai.embedding_cache import get_embedding_cache
+from app.ai.knowledge_base import (
+    EMBEDDING_MAX_CHARS,
+    KnowledgeBaseCore,
+    PAYLOAD_INDEXES,
+    _collection_config,
+    _cache_schema,
+    _embedding_batches,
+    _hybrid_schema_cache,
+    invalidate_schema_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncKnowledgeBase(KnowledgeBaseCore):
+    """
+    Same API as KnowledgeBase, with every method a coroutine.
+    Shares the per-process schema cache with the sync implementation.
+    """
+
+    def __init__(self, qdrant_url: str):
+        self.client = AsyncQdrantClient(url=qdrant_url, check_compatibility=False)
+        self.openai = get_async_openai_client()
+        self.embedding_cache = get_embedding_cache()
+
+    async def close(self):
+        await self.client.close()
+
+    async def _embed(self, text: str) -> list[float]:
+        """Generate dense embedding for text."""
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Generate dense embeddings for many texts, reusing cached vectors."""
+        texts = [text[:EMBEDDING_MAX_CHARS] for text in texts]
+        embeddings = await self.embedding_cache.aget_many(texts)
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            fresh: list[list[float]] = []
+            for batch in _embedding_batches(missing_texts):
+                resp = await self.openai.embeddings.create(model=settings.EMBEDDING_MODEL, input=batch)
+                fresh.extend(item.embedding for item in sorted(resp.data, key=lambda d: d.index))
+            await self.embedding_cache.aset_many(missing_texts, fresh)
+            for i, vector in zip(missing, fresh):
+                embeddings[i] = vector
+        return embeddings
+
+    async def _create_payload_indexes(self, collection_name: str):
+        """Create payload indexes for fast filtering."""
+        for field_name, schema_type in PAYLOAD_INDEXES:
+            try:
+                await self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=schema_type,
+                )
+                logger.info(f"Created payload index {field_name} on {collection_name}")
+            except Exception as e:
+                logger.warning(f"Payload index creation (may already exist) | field={field_name} | error={e}")
+
+    async def _supports_hybrid(self, collection_name: str) -> bool:
+        """Check (cached per process) if collection has named dense + sparse vectors."""
+        cached = _hybrid_schema_cache.get(collection_name)
+        if cached is not None:
+            return cached
+        try:
+            info = await self.client.get_collection(collection_name)
+        except Exception:
+            return False
+        return _cache_schema(collection_name, info)
+
+    async def _ensure_collection(self, collection_name: str):
+        try:
+            info = await self.client.get_collection(collection_name)
+        except Exception:
+            await self._create_collection(collection_name)
+            return
+        _cache_schema(collection_name, info)
+        logger.info(f"Collection {collection_name} already exists")
+        # Indexes added since the collection was created (creation is idempotent)
+        await self._create_payload_indexes(collection_name)
+
+    async def _create_collection(self, collection_name: str):
+        await self.client.create_collection(collection_name=collection_name, **_collection_config())
+        _hybrid_schema_cache[collection_name] = True
+        await self._create_payload_indexes(collection_name)
+        logger.info(f"Created collection {collection_name} with hybrid vectors")
+
+    async def ensure_transcripts_collection(self):
+        """Create transcripts collection with dense + sparse vectors and indexes."""
+        await self._ensure_collection(settings.TRANSCRIPTS_COLLECTION)
+
+    async def ensure_use_cases_collection(self):
+        """Create use_cases collection with dense + sparse vectors and indexes."""
+        await self._ensure_collection(settings.USE_CASES_COLLECTION)
+
+    async def recreate_collection(self, collection_name: str):
+        """Drop and recreate a collection with the hybrid schema. All points are lost."""
+        invalidate_schema_cache(collection_name)
+        if await self.client.collection_exists(collection_name):
+            await self.client.delete_collection(collection_name)
+        await self._create_collection(collection_name)
+
+    async def upsert_transcript_chunk(
+        self,
+        transcript_id: str,
+        company_id: str,
+        chunk_index: int,
+        text: str,
+        metadata: Optional[dict] = None,
+    ):
+        """Upsert a transcript chunk with dense and sparse vectors (or dense only for legacy)."""
+        hybrid = await self._supports_hybrid(settings.TRANSCRIPTS_COLLECTION)
+        points = self._transcript_chunk_points(
+            transcript_id, company_id, [text], [await self._embed(text)], hybrid, metadata, chunk_index
+        )
+        await self._upsert_points(settings.TRANSCRIPTS_COLLECTION, points)
+
+    async def upsert_use_case(
+        self,
+        use_case_id: str,
+        company_id: str,
+        title: str,
+        description: str,
+        metadata: Optional[dict] = None,
+    ):
+        """Upsert a use case with dense and sparse vectors (or dense only for legacy)."""
+        await self.upsert_use_cases([{
+            "use_case_id": use_case_id,
+            "company_id": company_id,
+            "title": title,
+            "description": description,
+            "metadata": metadata,
+        }])
+
+    async def upsert_transcript_chunks(
+        self,
+        transcript_id: str,
+        company_id: str,
+        chunks: list[str],
+        metadata: Optional[dict] = None,
+    ):
+        """Bulk upsert transcript chunks: batched embeddings and batched Qdrant writes."""
+        if not chunks:
+            return
+        hybrid = await self._supports_hybrid(settings.TRANSCRIPTS_COLLECTION)
+        dense_vectors = await self.embed_batch(chunks)
+        points = self._transcript_chunk_points(
+            transcript_id, company_id, chunks, dense_vectors, hybrid, metadata
+        )
+        await self._upsert_points(settings.TRANSCRIPTS_COLLECTION, points)
+
+    async def upsert_use_cases(self, use_cases: list[dict]):
+        """Bulk upsert use cases (items need use_case_id, company_id, title, description)."""
+        if not use_cases:
+            return
+        hybrid = await self._supports_hybrid(settings.USE_CASES_COLLECTION)
+        dense_vectors = await self.embed_batch([self._use_case_text(uc) for uc in use_cases])
+        points = self._use_case_points(use_cases, dense_vectors, hybrid)
+        await self._upsert_points(settings.USE_CASES_COLLECTION, points)
+
+    async def _upsert_points(self, collection_name: str, points: list[PointStruct]):
+        try:
+            for i in range(0, len(points), settings.UPSERT_BATCH_SIZE):
+                await self.client.upsert(
+                    collection_name=collection_name,
+                    points=points[i : i + settings.UPSERT_BATCH_SIZE],
+                )
+        except Exception:
+            invalidate_schema_cache(collection_name)
+            raise
+
+    async def _hybrid_search(
+        self,
+        collection_name: str,
+        query: str,
+        limit: int = 5,
+        company_id: Optional[str] = None,
+    ) -> list[dict]:
+        """Hybrid dense + sparse search fused with RRF (see KnowledgeBase._hybrid_search)."""
+        return await self._hybrid_search_with_vector(
+            collection_name, query, await self._embed(query), limit, self._qdrant_filter(company_id)
+        )
+
+    async def _hybrid_search_with_vector(
+        self,
+        collection_name: str,
+        query: str,
+        dense_vector: list[float],
+        limit: int,
+        q_filter: Optional[Filter],
+    ) -> list[dict]:
+        """Hybrid search with a precomputed query embedding."""
+        if not await self._supports_hybrid(collection_name):
+            return await self._dense_only_search(collection_name, dense_vector, limit, q_filter)
+
+        sparse_vector = self._sparse_query_vector(collection_name, query)
+        if not sparse_vector.indices:
+            return await self._dense_only_search(collection_name, dense_vector, limit, q_filter)
+        try:
+            results = await self.client.query_points(
+                collection_name=collection_name,
+                prefetch=self._hybrid_prefetch(dense_vector, sparse_vector, q_filter, limit),
+                query=FusionQuery(fusion=Fusion.RRF),
+                limit=limit,
+                with_payload=True,
+            )
+            return self._to_results(results.points)
+        except Exception as e:
+            logger.warning(f"Hybrid search failed, falling back to dense only: {e}")
+            invalidate_schema_cache(collection_name)
+            return await self._dense_only_search(collection_name, dense_vector, limit, q_filter)
+
+    async def _dense_only_search(
+        self,
+        collection_name: str,
+        dense_vector: list[float],
+        limit: int,
+        q_filter: Optional[Filter],
+        score_threshold: Optional[float] = None,
+    ) -> list[dict]:
+        """Fallback when collection has single vector or hybrid fails."""
+        last_error = None
+        for using in (None, settings.DENSE_VECTOR_NAME):
+            try:
+                results = await self.client.query_points(
+                    collection_name=collection_name,
+                    query=dense_vector,
+                    using=using,
+                    limit=limit,
+                    query_filter=q_filter,
+                    score_threshold=score_threshold,
+                    with_payload=True,
+                )
+                return self._to_results(results.points)
+            except Exception as e:
+                last_error = e
+        logger.error(f"Dense search failed: {last_error}")
+        return []
+
+    async def search_transcripts(
+        self, query: str, limit: int = 5, company_id: Optional[str] = None
+    ):
+        """Hybrid search over transcript chunks."""
+        return await self._hybrid_search(
+            settings.TRANSCRIPTS_COLLECTION, query, limit, company_id
+        )
+
+    async def search_use_cases(
+        self,
+        query: str,
+        limit: int = 5,
+        company_id: Optional[str] = None,
+        filters: Optional[dict] = None,
+        score_threshold: Optional[float] = None,
+    ):
+        """
+        Hybrid search over use cases; filters are _use_case_filter keyword arguments.
+        With score_threshold the ranking is dense only: RRF scores are rank based,
+        so only cosine similarity can be held to a threshold.
+        """
+        q_filter = self._use_case_filter(company_id=company_id, **(filters or {}))
+        dense_vector = await self._embed(query)
+        if score_threshold is not None:
+            return await self._dense_only_search(
+                settings.USE_CASES_COLLECTION, dense_vector, limit, q_filter, score_threshold
+            )
+        return await self._hybrid_search_with_vector(
+            settings.USE_CASES_COLLECTION, query, dense_vector, limit, q_filter
+        )
+
+    async def similar_use_cases(
+        self,
+        use_case_id: str,
+        limit: int = 10,
+        company_id: Optional[str] = None,
+        industry_id: Optional[str] = None,
+        score_threshold: Optional[float] = None,
+    ) -> Optional[list[dict]]:
+        """
+        Nearest neighbours of a stored use case by its dense vector (query by point id:
+        no re-embedding). None when the use case has no point yet; [] when the
+        query fails for any other reason.
+        """
+        collection_name = settings.USE_CASES_COLLECTION
+        point_id = self._point_id("usecase", use_case_id)
+        try:
+            results = await self.client.query_points(
+                collection_name=collection_name,
+                query=point_id,
+                using=settings.DENSE_VECTOR_NAME if await self._supports_hybrid(collection_name) else None,
+                query_filter=self._similar_filter(point_id, company_id, industry_id),
+                score_threshold=score_threshold,
+                limit=limit,
+                with_payload=True,
+            )
+        except Exception as e:
+            if await self._point_missing(collection_name, point_id):
+                return None
+            logger.warning(f"Similar use case query failed | use_case_id={use_case_id} | error={e}")
+            return []
+        return self._to_results(results.points)
+
+    async def _point_missing(self, collection_name: str, point_id: int) -> bool:
+        """True only when Qdrant confirms the point does not exist."""
+        try:
+            points = await self.client.retrieve(
+                collection_name=collection_name, ids=[point_id], with_payload=False, with_vectors=False
+            )
+        except Exception:
+            return False
+        return not points
+
+    async def search_all(
+        self, query: str, limit: int = 10, company_id: Optional[str] = None
+    ):
+        """
+        Search both transcripts and use cases with hybrid RRF.
+        The query is embedded once and both collections are queried concurrently.
+        """
+        dense_vector = await self._embed(query)
+        q_filter = self._qdrant_filter(company_id)
+        transcripts, use_cases = await asyncio.gather(
+            self._hybrid_search_with_vector(
+                settings.TRANSCRIPTS_COLLECTION, query, dense_vector, limit // 2, q_filter
+            ),
+            self._hybrid_search_with_vector(
+                settings.USE_CASES_COLLECTION, query, dense_vector, limit // 2, q_filter
+            ),
+        )
+        return {"transcripts": transcripts, "use_cases": use_cases}
+
+    async def delete_transcript(self, transcript_id: str):
+        """Delete all chunks for a transcript."""
+        await self.client.delete(
+            collection_name=settings.TRANSCRIPTS_COLLECTION,
+            points_selector=self._transcript_filter(transcript_id),
+        )
+
+    async def delete_use_case(self, use_case_id: str):
+        """Delete a use case from the knowledge base."""
+        await self.client.delete(
+            collection_name=settings.USE_CASES_COLLECTION,
+            points_selector=[self._point_id("usecase", use_case_id)],
+        )
+
+    async def delete_company_embeddings(self, company_id: str):
+        """Delete all transcript and use case embeddings for a company."""
+        q_filter = self._qdrant_filter(company_id)
+        if not q_filter:
+            return
+        for collection_name in (settings.TRANSCRIPTS_COLLECTION, settings.USE_CASES_COLLECTION):
+            try:
+                await self.client.delete(collection_name=collection_name, points_selector=q_filter)
+                logger.info(f"Deleted company embeddings | company_id={company_id} | collection={collection_name}")
+            except Exception as e:
+                logger.warning(f"Failed to delete company embeddings | company_id={company_id} | collection={collection_name} | error={e}")
+
+
+_async_knowledge_base: AsyncKnowledgeBase | None = None
+
+
+def get_async_knowledge_base() -> AsyncKnowledgeBase:
+    """Return the shared AsyncKnowledgeBase (one client pool per API process)."""
+    global _async_knowledge_base
+    if _async_knowledge_base is None:
+        _async_knowledge_base = AsyncKnowledgeBase(settings.QDRANT_URL)
+    return _async_knowledge_base
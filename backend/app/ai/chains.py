@@ -1,3 +1,4 @@
+import hashlib
 from typing import List, Optional
 
 from app.config import settings
@@ -36,18 +37,11 @@ Raise confidence_score if a use case was mentioned multiple times. Keep distinct
 CRITICAL: Do NOT output any use case that is semantically similar to one already in the "already_extracted" list.
 Treat "already_extracted" as the canonical list of use cases already produced—do not duplicate them."""
 
-def create_extraction_chain(
-    model: str | None = None,
-    temperature: float = 0.3,
-) -> any:  # returns Runnable
-    if not settings.OPENROUTER_API_KEY:
-        raise ValueError("OPENROUTER_API_KEY environment variable not set")
-
-    llm = get_chat_llm(model=model, temperature=temperature)
+DEFAULT_TEMPERATURE = 0.3
 
-    parser = PydanticOutputParser(pydantic_object=ExtractionResult)
 
-    prompt = PromptTemplate(
+def _extraction_prompt(parser: PydanticOutputParser) -> PromptTemplate:
+    return PromptTemplate(
         template=(
             "{system_prompt}\n\n"
             "{format_instructions}\n\n"
@@ -60,11 +54,32 @@ def create_extraction_chain(
         },
     )
 
+
+# Changes whenever the MAP prompt or output schema changes; part of the extraction cache key
+MAP_PROMPT_VERSION = hashlib.sha256(
+    _extraction_prompt(PydanticOutputParser(pydantic_object=ExtractionResult)).format(text="").encode("utf-8")
+).hexdigest()[:16]
+
+
+def create_extraction_chain(
+    model: str | None = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+) -> any:  # returns Runnable
+    if not settings.OPENROUTER_API_KEY:
+        raise ValueError("OPENROUTER_API_KEY environment variable not set")
+
+    llm = get_chat_llm(model=model, temperature=temperature)
+
+    parser = PydanticOutputParser(pydantic_object=ExtractionResult)
+
+    prompt = _extraction_prompt(parser)
+
     return prompt | llm | parser
 
+
 def create_reduction_chain(
     model: str | None = None,
-    temperature: float = 0.3,
+    temperature: float = DEFAULT_TEMPERATURE,
 ) -> any:
     if not settings.OPENROUTER_API_KEY:
         raise ValueError("OPENROUTER_API_KEY environment variable not set")
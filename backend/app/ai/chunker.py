@@ -1,27 +1,329 @@
-CHUNK_SIZE = 6000  # ~tokens (chars / 4)
+"""
+Token-accurate, streaming transcript chunker.
+
+Paragraphs (blank-line separated) are packed into chunks of at most the
+model's chunk size, counted with the model's tiktoken encoder. A paragraph
+that overflows is split on speaker turns, then sentences, then hard token
+windows. Overlap is carried as whole trailing units, computed incrementally,
+and chunks are yielded one at a time so memory stays bounded by one chunk.
+
+Speaker-turn structured transcripts ("Name (Role): ...", optionally with a
+timestamp) can instead be packed as whole turns, with turn-level overlap and
+the turn range recorded in each chunk's metadata (CHUNK_STRATEGY).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Iterator, NamedTuple, Optional
+
+import tiktoken
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 6000  # tokens
 CHUNK_OVERLAP = 500  # preserve context across boundaries
 
+# (chunk size, overlap) in tokens, by model name prefix; first match wins
+MODEL_CHUNK_SIZES: dict[str, tuple[int, int]] = {
+    "openai/gpt-4o": (6000, 500),
+    "openai/gpt-4.1": (8000, 600),
+    "anthropic/": (8000, 600),
+    "google/gemini": (8000, 600),
+}
 
-def chunk_transcript(text: str) -> list[str]:
+FALLBACK_ENCODING = "o200k_base"
+CHARS_PER_TOKEN = 4  # estimate when no encoder can be loaded
+ENCODER_RETRY_INTERVAL = 300  # seconds before retrying an encoder that failed to load
+SEP_TOKENS = 1  # budget per unit separator ("\n\n", "\n" and " " are one token each)
+
+PARAGRAPH_SEP = "\n\n"
+SPEAKER_TURN = re.compile(r"\n(?=[^\W\d_][^\n:]{0,60}:\s)")
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+TURN_HEADER = re.compile(
+    r"^[ \t]*(?:\[?(?P<timestamp>\d{1,2}:\d{2}(?::\d{2})?)\]?[ \t]*[-–]?[ \t]*)?"
+    r"(?P<speaker>[^\W\d_][\w.'’\- ]{0,40}?)(?:[ \t]*\((?P<role>[^)\n]{1,60})\))?[ \t]*:[ \t]",
+    re.MULTILINE,
+)
+# Header-style metadata labels ("Company: Acme", "Date: ...") that are not speakers
+METADATA_LABELS = frozenset({
+    "agenda", "attendees", "cc", "company", "date", "duration", "from", "location", "meeting",
+    "note", "notes", "participants", "project", "re", "subject", "summary", "time", "title", "to", "topic",
+})
+MIN_TURNS = 3  # turns by recurring speakers needed in the sample before "auto" picks the turn strategy
+TURN_SAMPLE_CHARS = 20_000
+
+
+class Turn(NamedTuple):
+    index: int
+    speaker: Optional[str]  # None for text before the first turn (title, header lines)
+    timestamp: Optional[str]
+    text: str
+
+
+class TranscriptChunk(NamedTuple):
+    text: str
+    metadata: dict
+
+
+class _Unit(NamedTuple):
+    text: str
+    tokens: int
+    sep: str  # separator placed before this unit when joined
+    turn: Optional[Turn] = None
+
+
+def chunk_sizes(model: Optional[str] = None) -> tuple[int, int]:
+    """(chunk size, overlap) for a model; CHUNK_SIZE/CHUNK_OVERLAP settings override."""
+    model = model or settings.CHAT_MODEL
+    size, overlap = next(
+        (sizes for prefix, sizes in MODEL_CHUNK_SIZES.items() if model.startswith(prefix)),
+        (CHUNK_SIZE, CHUNK_OVERLAP),
+    )
+    return settings.CHUNK_SIZE or size, settings.CHUNK_OVERLAP if settings.CHUNK_OVERLAP is not None else overlap
+
+
+_encoder_failures: dict[str, float] = {}  # model name -> monotonic time of the last failed load
+
+
+@lru_cache(maxsize=8)
+def _load_encoder(name: str) -> tiktoken.Encoding:
+    """Loaded encoders are cached; failures raise and are not."""
+    try:
+        return tiktoken.encoding_for_model(name)
+    except KeyError:
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+
+
+def get_encoder(model: Optional[str] = None) -> Optional[tiktoken.Encoding]:
     """
-    Split on double-newline paragraph boundaries.
-    Keeps an overlap tail from the previous chunk to catch cross-boundary ideas.
+    tiktoken encoder for a model (OpenRouter prefixes stripped); None (estimate
+    tokens) if it cannot be loaded. A failed load, e.g. a transient download
+    error, is retried after ENCODER_RETRY_INTERVAL.
     """
-    paragraphs = text.split("\n\n")
-    chunks, current, current_len = [], [], 0
-
-    for para in paragraphs:
-        para_len = len(para) // 4  # rough token estimate
-        if current_len + para_len > CHUNK_SIZE and current:
-            chunks.append("\n\n".join(current))
-            # Keep overlap from end of current chunk
-            overlap_text = "\n\n".join(current)[-CHUNK_OVERLAP * 4 :]
-            current = [overlap_text, para]
-            current_len = CHUNK_OVERLAP + para_len
-        else:
-            current.append(para)
-            current_len += para_len
+    name = (model or settings.CHAT_MODEL).split("/")[-1]
+    failed_at = _encoder_failures.get(name)
+    if failed_at is not None and time.monotonic() - failed_at < ENCODER_RETRY_INTERVAL:
+        return None
+    try:
+        encoder = _load_encoder(name)
+    except Exception as e:
+        _encoder_failures[name] = time.monotonic()
+        logger.warning(f"tiktoken encoder unavailable, estimating tokens | model={name} | error={e}")
+        return None
+    _encoder_failures.pop(name, None)
+    return encoder
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    encoder = get_encoder(model)
+    if encoder is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def iter_paragraphs(text: str) -> Iterator[str]:
+    """Blank-line separated paragraphs, without materializing the whole list."""
+    start = 0
+    while start <= len(text):
+        end = text.find(PARAGRAPH_SEP, start)
+        if end == -1:
+            end = len(text)
+        paragraph = text[start:end].strip()
+        if paragraph:
+            yield paragraph
+        start = end + len(PARAGRAPH_SEP)
+
+
+def _token_windows(text: str, size: int, model: Optional[str]) -> Iterator[str]:
+    """Last resort for a single oversized sentence: fixed token windows."""
+    encoder = get_encoder(model)
+    if encoder is None:
+        step = size * CHARS_PER_TOKEN
+        for i in range(0, len(text), step):
+            yield text[i : i + step]
+        return
+    tokens = encoder.encode(text, disallowed_special=())
+    for i in range(0, len(tokens), size):
+        yield encoder.decode(tokens[i : i + size])
+
+
+def _split_paragraph(paragraph: str, size: int, model: Optional[str]) -> Iterator[_Unit]:
+    """Units of at most `size` tokens: the whole paragraph, or its turns / sentences / windows."""
+    tokens = count_tokens(paragraph, model)
+    if tokens <= size:
+        yield _Unit(paragraph, tokens, PARAGRAPH_SEP)
+        return
+
+    sep = PARAGRAPH_SEP
+    for turn in SPEAKER_TURN.split(paragraph):
+        turn_tokens = count_tokens(turn, model)
+        if turn_tokens <= size:
+            yield _Unit(turn, turn_tokens, sep)
+            sep = "\n"
+            continue
+        for sentence in SENTENCE_END.split(turn):
+            sentence_tokens = count_tokens(sentence, model)
+            if sentence_tokens <= size:
+                yield _Unit(sentence, sentence_tokens, sep)
+            else:
+                for window in _token_windows(sentence, size, model):
+                    yield _Unit(window, count_tokens(window, model), sep)
+            sep = " "
+        sep = "\n"
+
 
+def _join(units: list[_Unit]) -> str:
+    return "".join(u.sep + u.text if i else u.text for i, u in enumerate(units))
+
+
+def _overlap_tail(units: list[_Unit], overlap: int) -> tuple[list[_Unit], int]:
+    """Longest run of trailing units within the overlap budget (separators included)."""
+    tail: list[_Unit] = []
+    total = 0
+    for unit in reversed(units):
+        cost = unit.tokens + (SEP_TOKENS if tail else 0)
+        if total + cost > overlap:
+            break
+        tail.append(unit)
+        total += cost
+    tail.reverse()
+    return tail, total
+
+
+def pack_units(units: Iterator[_Unit], size: int, overlap: int) -> Iterator[list[_Unit]]:
+    """
+    Greedily pack units into chunks of <= size tokens with a unit-level overlap
+    tail; each separator between units counts SEP_TOKENS.
+    """
+    current: list[_Unit] = []
+    current_len = 0
+    for unit in units:
+        if current and current_len + SEP_TOKENS + unit.tokens > size:
+            yield current
+            current, current_len = _overlap_tail(current, overlap)
+            # Overlap that no longer fits next to the unit is dropped
+            while current and current_len + SEP_TOKENS + unit.tokens > size:
+                dropped = current.pop(0)
+                current_len -= dropped.tokens + (SEP_TOKENS if current else 0)
+        current_len += unit.tokens + (SEP_TOKENS if current else 0)
+        current.append(unit)
     if current:
-        chunks.append("\n\n".join(current))
-    return chunks
+        yield current
+
+
+def _resolve_sizes(model: Optional[str], chunk_size: Optional[int], overlap: Optional[int]) -> tuple[int, int]:
+    default_size, default_overlap = chunk_sizes(model)
+    return chunk_size or default_size, default_overlap if overlap is None else overlap
+
+
+def iter_chunks(
+    text: str,
+    model: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    overlap: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield token-bounded chunks of `text` in a single pass."""
+    size, overlap = _resolve_sizes(model, chunk_size, overlap)
+    units = (
+        unit
+        for paragraph in iter_paragraphs(text)
+        for unit in _split_paragraph(paragraph, size, model)
+    )
+    for packed in pack_units(units, size, overlap):
+        yield _join(packed)
+
+
+def _turn_headers(text: str) -> Iterator[re.Match]:
+    """TURN_HEADER matches, minus metadata lines (a METADATA_LABELS label without a role)."""
+    for match in TURN_HEADER.finditer(text):
+        if match.group("role") is None and match.group("speaker").strip().casefold() in METADATA_LABELS:
+            continue
+        yield match
+
+
+def parse_turns(text: str) -> Iterator[Turn]:
+    """Speaker turns in order; text before the first turn becomes a turn without speaker."""
+    index = 0
+    previous = None
+    position = 0
+    for match in _turn_headers(text):
+        body = text[position : match.start()].strip()
+        if previous is not None or body:
+            speaker, timestamp = (previous.group("speaker").strip(), previous.group("timestamp")) if previous else (None, None)
+            yield Turn(index, speaker, timestamp, body)
+            index += 1
+        previous = match
+        position = match.start()
+    body = text[position:].strip()
+    if body:
+        speaker, timestamp = (previous.group("speaker").strip(), previous.group("timestamp")) if previous else (None, None)
+        yield Turn(index, speaker, timestamp, body)
+
+
+def is_turn_structured(text: str) -> bool:
+    """Whether the start of the transcript reads as speaker turns (by speakers who talk more than once)."""
+    counts = Counter(match.group("speaker").strip() for match in _turn_headers(text[:TURN_SAMPLE_CHARS]))
+    return sum(count for count in counts.values() if count > 1) >= MIN_TURNS
+
+
+def _turn_metadata(units: list[_Unit]) -> dict:
+    turns = list({u.turn.index: u.turn for u in units if u.turn is not None}.values())
+    if not turns:
+        return {}
+    timestamps = [t.timestamp for t in turns if t.timestamp]
+    return {
+        "turn_start": turns[0].index,
+        "turn_end": turns[-1].index,
+        "speakers": list(dict.fromkeys(t.speaker for t in turns if t.speaker)),
+        "time_start": timestamps[0] if timestamps else None,
+        "time_end": timestamps[-1] if timestamps else None,
+    }
+
+
+def iter_turn_chunks(
+    text: str,
+    model: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    overlap: Optional[int] = None,
+) -> Iterator[TranscriptChunk]:
+    """
+    Pack whole speaker turns into token-bounded chunks; overlap is whole turns.
+    A turn larger than a chunk is split like an oversized paragraph.
+    """
+    size, overlap = _resolve_sizes(model, chunk_size, overlap)
+    units = (
+        unit._replace(turn=turn)
+        for turn in parse_turns(text)
+        for unit in _split_paragraph(turn.text, size, model)
+    )
+    for packed in pack_units(units, size, overlap):
+        yield TranscriptChunk(_join(packed), _turn_metadata(packed))
+
+
+def iter_transcript_chunks(text: str, model: Optional[str] = None) -> Iterator[TranscriptChunk]:
+    """Chunks with metadata using settings.CHUNK_STRATEGY ("auto", "turns" or "paragraphs")."""
+    strategy = settings.CHUNK_STRATEGY
+    if strategy == "turns" or (strategy == "auto" and is_turn_structured(text)):
+        yield from iter_turn_chunks(text, model)
+    else:
+        for chunk in iter_chunks(text, model):
+            yield TranscriptChunk(chunk, {})
+
+
+def split_transcript(text: str) -> list[TranscriptChunk]:
+    """Chunk texts plus per-chunk metadata (turn ranges for turn-structured transcripts)."""
+    return list(iter_transcript_chunks(text))
+
+
+def chunk_transcript(text: str) -> list[str]:
+    """
+    Split into chunks sized for the configured model: whole speaker turns for
+    turn-structured transcripts, otherwise paragraphs (then speaker turns /
+    sentences for oversized paragraphs).
+    Keeps an overlap tail from the previous chunk to catch cross-boundary ideas.
+    """
+    return [chunk.text for chunk in iter_transcript_chunks(text)]
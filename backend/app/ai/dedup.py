@@ -0,0 +1,113 @@
+"""
+Embedding-based pre-deduplication of MAP-phase use cases.
+
+Overlapping chunks (CHUNK_OVERLAP) make the MAP phase emit many near-identical
+use cases. Titles and descriptions are embedded in one batch, compared with a
+cosine-similarity matrix and linked into clusters above DEDUP_CLUSTER_THRESHOLD.
+A cluster whose least similar pair still scores DEDUP_MERGE_THRESHOLD or more is
+merged deterministically; the remaining (ambiguous) clusters go to the LLM reduce.
+"""
+import logging
+from typing import Callable
+
+import numpy as np
+
+from app.ai.chains import ExtractedUseCase
+
+logger = logging.getLogger(__name__)
+
+MAX_TAGS = 5
+
+
+def _use_case_text(uc: ExtractedUseCase) -> str:
+    return f"{uc.title}\n{uc.description}"
+
+
+def similarity_matrix(vectors: list[list[float]]) -> np.ndarray:
+    """Pairwise cosine similarity of row vectors."""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.where(norms == 0, 1.0, norms)
+    return matrix @ matrix.T
+
+
+def cluster_indices(similarity: np.ndarray, threshold: float) -> list[list[int]]:
+    """Connected components of the graph with an edge wherever similarity >= threshold."""
+    n = similarity.shape[0]
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in np.argwhere(np.triu(similarity >= threshold, k=1)):
+        root_i, root_j = find(int(i)), find(int(j))
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(n):
+        clusters.setdefault(find(i), []).append(i)
+    # Ordered by first member, i.e. by position in the transcript
+    return sorted(clusters.values(), key=lambda members: members[0])
+
+
+def merge_cluster(use_cases: list[ExtractedUseCase]) -> ExtractedUseCase:
+    """
+    Deterministic merge: keep the most detailed description, union the tags and
+    raise confidence slightly per repeated mention (as the REDUCE prompt does).
+    """
+    primary = max(use_cases, key=lambda uc: (len(uc.description), uc.confidence_score))
+    tags: list[str] = []
+    for uc in [primary, *use_cases]:
+        for tag in uc.tags:
+            if tag not in tags:
+                tags.append(tag)
+    expected_benefit = primary.expected_benefit or next(
+        (uc.expected_benefit for uc in use_cases if uc.expected_benefit), None
+    )
+    confidence = max(uc.confidence_score for uc in use_cases) + 0.05 * (len(use_cases) - 1)
+    return ExtractedUseCase(
+        title=primary.title,
+        description=primary.description,
+        expected_benefit=expected_benefit,
+        tags=tags[:MAX_TAGS],
+        confidence_score=min(1.0, confidence),
+    )
+
+
+def prededuplicate(
+    use_cases: list[ExtractedUseCase],
+    embed_batch: Callable[[list[str]], list[list[float]]],
+    cluster_threshold: float,
+    merge_threshold: float,
+) -> tuple[list[ExtractedUseCase], list[list[ExtractedUseCase]]]:
+    """
+    Split use cases into (resolved, ambiguous clusters).
+    Resolved holds singletons and deterministically merged clusters; each
+    ambiguous cluster still needs the LLM to decide what is a duplicate.
+    """
+    if len(use_cases) < 2:
+        return list(use_cases), []
+
+    similarity = similarity_matrix(embed_batch([_use_case_text(uc) for uc in use_cases]))
+    resolved: list[ExtractedUseCase] = []
+    ambiguous: list[list[ExtractedUseCase]] = []
+    merged = 0
+    for members in cluster_indices(similarity, cluster_threshold):
+        cluster = [use_cases[i] for i in members]
+        if len(cluster) == 1:
+            resolved.append(cluster[0])
+        elif similarity[np.ix_(members, members)].min() >= merge_threshold:
+            resolved.append(merge_cluster(cluster))
+            merged += 1
+        else:
+            ambiguous.append(cluster)
+
+    logger.info(
+        f"Pre-dedup done | raw={len(use_cases)} | resolved={len(resolved)} | "
+        f"merged_clusters={merged} | ambiguous_clusters={len(ambiguous)}"
+    )
+    return resolved, ambiguous
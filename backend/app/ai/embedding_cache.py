@@ -0,0 +1,168 @@
+"""
+Two-tier cache for dense embeddings: a bounded in-process LRU in front of a
+Redis tier with TTL shared by the API and the Celery workers.
+Keys are (embedding model, sha256 of the normalized text).
+"""
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Optional
+
+from redis import Redis
+from redis import asyncio as aioredis
+
+from app.clients import get_async_redis, get_redis
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case so near-identical queries share a key."""
+    return " ".join(text.split()).casefold()
+
+
+def _encode(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _decode(raw: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(raw)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """
+    Read path: LRU -> Redis -> miss. Redis errors are logged and treated as
+    misses so the cache can never fail an embedding call.
+    """
+
+    def __init__(self, model: str, max_size: int, ttl: int):
+        self.model = model
+        self.max_size = max_size
+        self.ttl = ttl
+        # Packed float32 (the Redis form): ~6 KB per 1536-dim vector instead of ~50 KB as a list
+        self._lru: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.lru_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"emb:{self.model}:{digest}"
+
+    def stats(self) -> dict:
+        return {
+            "lru_hits": self.lru_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "lru_size": len(self._lru),
+        }
+
+    # ── LRU tier ──────────────────────────────────────────────────────────
+    def _lru_get(self, key: str) -> Optional[list[float]]:
+        with self._lock:
+            raw = self._lru.get(key)
+            if raw is not None:
+                self._lru.move_to_end(key)
+        return _decode(raw) if raw is not None else None
+
+    def _lru_put(self, key: str, vector: list[float] | bytes):
+        raw = vector if isinstance(vector, bytes) else _encode(vector)
+        with self._lock:
+            self._lru[key] = raw
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    def _lookup_lru(self, texts: list[str]) -> tuple[list[str], list[Optional[list[float]]], list[int]]:
+        keys = [self.key(t) for t in texts]
+        vectors = [self._lru_get(k) for k in keys]
+        pending = [i for i, v in enumerate(vectors) if v is None]
+        self.lru_hits += len(texts) - len(pending)
+        return keys, vectors, pending
+
+    def _fill_from_redis(self, keys, vectors, pending, raws) -> None:
+        for i, raw in zip(pending, raws):
+            if raw is None:
+                self.misses += 1
+                continue
+            vectors[i] = _decode(raw)
+            self._lru_put(keys[i], raw)
+            self.redis_hits += 1
+
+    # ── Sync API (Celery / KnowledgeBase) ─────────────────────────────────
+    def _sync_redis(self) -> Redis:
+        return get_redis()
+
+    def get_many(self, texts: list[str]) -> list[Optional[list[float]]]:
+        """Cached vectors in input order; None where both tiers miss."""
+        keys, vectors, pending = self._lookup_lru(texts)
+        if not pending:
+            return vectors
+        try:
+            raws = self._sync_redis().mget([keys[i] for i in pending])
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis read failed: {e}")
+            raws = [None] * len(pending)
+        self._fill_from_redis(keys, vectors, pending, raws)
+        return vectors
+
+    def set_many(self, texts: list[str], vectors: list[list[float]]):
+        keys = [self.key(t) for t in texts]
+        for key, vector in zip(keys, vectors):
+            self._lru_put(key, vector)
+        try:
+            pipe = self._sync_redis().pipeline(transaction=False)
+            for key, vector in zip(keys, vectors):
+                pipe.set(key, _encode(vector), ex=self.ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis write failed: {e}")
+
+    # ── Async API (API process / AsyncKnowledgeBase) ──────────────────────
+    def _async_redis(self) -> aioredis.Redis:
+        return get_async_redis()
+
+    async def aget_many(self, texts: list[str]) -> list[Optional[list[float]]]:
+        keys, vectors, pending = self._lookup_lru(texts)
+        if not pending:
+            return vectors
+        try:
+            raws = await self._async_redis().mget([keys[i] for i in pending])
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis read failed: {e}")
+            raws = [None] * len(pending)
+        self._fill_from_redis(keys, vectors, pending, raws)
+        return vectors
+
+    async def aset_many(self, texts: list[str], vectors: list[list[float]]):
+        keys = [self.key(t) for t in texts]
+        for key, vector in zip(keys, vectors):
+            self._lru_put(key, vector)
+        try:
+            pipe = self._async_redis().pipeline(transaction=False)
+            for key, vector in zip(keys, vectors):
+                pipe.set(key, _encode(vector), ex=self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis write failed: {e}")
+
+
+_embedding_cache: EmbeddingCache | None = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the per-process embedding cache."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            settings.EMBEDDING_MODEL,
+            settings.EMBEDDING_CACHE_SIZE,
+            settings.EMBEDDING_CACHE_TTL,
+        )
+    return _embedding_cache
@@ -0,0 +1,70 @@
+"""
+Persistent cache of MAP-phase extraction results.
+Keyed by (sha256 of the chunk text, MAP prompt version, model, temperature), so
+reprocessing or re-uploading an identical transcript skips the LLM entirely.
+Entries for an outdated prompt are never read again and can be purged via
+DELETE /admin/extraction-cache.
+"""
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.ai.chains import ExtractionResult, MAP_PROMPT_VERSION, DEFAULT_TEMPERATURE
+from app.ai.knowledge_base import content_hash
+from app.config import settings
+from app.models import ExtractionCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def _key_filter(model: str, temperature: float):
+    return (
+        ExtractionCacheEntry.prompt_version == MAP_PROMPT_VERSION,
+        ExtractionCacheEntry.model == model,
+        ExtractionCacheEntry.temperature == temperature,
+    )
+
+
+def get_cached_extractions(
+    db: Session,
+    chunks: list[str],
+    model: str | None = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+) -> dict[int, ExtractionResult]:
+    """Return {chunk index: ExtractionResult} for chunks already extracted with the current prompt."""
+    model = model or settings.CHAT_MODEL
+    hashes = [content_hash(chunk) for chunk in chunks]
+    rows = db.execute(
+        select(ExtractionCacheEntry.chunk_hash, ExtractionCacheEntry.result).where(
+            ExtractionCacheEntry.chunk_hash.in_(set(hashes)),
+            *_key_filter(model, temperature),
+        )
+    ).all()
+    by_hash = {}
+    for chunk_hash, result in rows:
+        try:
+            by_hash[chunk_hash] = ExtractionResult.model_validate(result)
+        except Exception as e:
+            # Schema drift without a prompt change; treat as a miss
+            logger.warning(f"Discarding unreadable extraction cache entry | chunk_hash={chunk_hash} | error={e}")
+    return {i: by_hash[h] for i, h in enumerate(hashes) if h in by_hash}
+
+
+def store_extraction(
+    db: Session,
+    chunk: str,
+    result: ExtractionResult,
+    model: str | None = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+):
+    """Insert a MAP result; concurrent writers of the same key are ignored. Caller commits."""
+    stmt = insert(ExtractionCacheEntry).values(
+        chunk_hash=content_hash(chunk),
+        prompt_version=MAP_PROMPT_VERSION,
+        model=model or settings.CHAT_MODEL,
+        temperature=temperature,
+        result=result.model_dump(mode="json"),
+    ).on_conflict_do_nothing(constraint="uq_extraction_cache_key")
+    db.execute(stmt)
@@ -2,7 +2,6 @@
 Qdrant-based knowledge base for transcripts and use cases.
 Uses hybrid search with RRF (Reciprocal Rank Fusion) combining dense + sparse vectors.
 """
-import re
 import logging
 from collections import Counter
 from typing import Optional
@@ -17,37 +16,308 @@ from qdrant_client.models import (
     Filter,
     FieldCondition,
     MatchValue,
+    MatchAny,
+    Range,
+    HasIdCondition,
     Prefetch,
     FusionQuery,
     Fusion,
     PayloadSchemaType,
+    Modifier,
+    PointVectors,
+    PointStruct,
+    SetPayload,
+    SetPayloadOperation,
 )
 from app.config import settings
 from app.clients import get_openai_client
+from app.ai.sparse_encoder import SparseEncoder
+from app.ai.embedding_cache import get_embedding_cache
 
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MAX_CHARS = 8000  # Per-input truncation before embedding
 
-def _text_to_sparse_indices_values(text: str) -> tuple[list[int], list[float]]:
+
+_SPARSE_ENCODERS = {
+    settings.TRANSCRIPTS_COLLECTION: SparseEncoder(
+        settings.SPARSE_BM25_K1, settings.SPARSE_BM25_B, settings.TRANSCRIPTS_AVG_DOC_LEN
+    ),
+    settings.USE_CASES_COLLECTION: SparseEncoder(
+        settings.SPARSE_BM25_K1, settings.SPARSE_BM25_B, settings.USE_CASES_AVG_DOC_LEN
+    ),
+}
+
+
+def content_hash(text: str) -> str:
+    """Stable content address for a transcript chunk."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Per-process cache: collection name -> has named dense + sparse vectors
+_hybrid_schema_cache: dict[str, bool] = {}
+
+
+def _cache_schema(collection_name: str, info) -> bool:
+    """Record whether a collection (from get_collection) supports hybrid search."""
+    params = getattr(info.config, "params", None)
+    vectors = params.vectors if params else None
+    hybrid = (
+        isinstance(vectors, dict)
+        and settings.DENSE_VECTOR_NAME in vectors
+        and bool(params.sparse_vectors)
+        and settings.SPARSE_VECTOR_NAME in params.sparse_vectors
+    )
+    _hybrid_schema_cache[collection_name] = hybrid
+    return hybrid
+
+
+def invalidate_schema_cache(collection_name: Optional[str] = None):
+    """Forget the cached schema for one collection (or all) so the next call re-probes Qdrant."""
+    if collection_name is None:
+        _hybrid_schema_cache.clear()
+    else:
+        _hybrid_schema_cache.pop(collection_name, None)
+
+
+def _collection_config() -> dict:
+    """create_collection kwargs for the hybrid (dense + sparse) schema."""
+    return {
+        "vectors_config": {
+            settings.DENSE_VECTOR_NAME: VectorParams(
+                size=settings.VECTOR_SIZE,
+                distance=Distance.COSINE,
+            )
+        },
+        "sparse_vectors_config": {
+            settings.SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF),
+        },
+    }
+
+
+PAYLOAD_INDEXES = [
+    ("company_id", PayloadSchemaType.KEYWORD),
+    ("transcript_id", PayloadSchemaType.KEYWORD),
+    ("use_case_id", PayloadSchemaType.KEYWORD),
+    # Use case search filters
+    ("industry_id", PayloadSchemaType.KEYWORD),
+    ("status", PayloadSchemaType.KEYWORD),
+    ("tags", PayloadSchemaType.KEYWORD),
+    ("confidence_score", PayloadSchemaType.FLOAT),
+]
+
+
+def use_case_metadata(status, tags: Optional[list], confidence_score: Optional[float], industry_id) -> dict:
+    """Filterable use case payload fields (mirrors the Postgres row)."""
+    return {
+        "status": getattr(status, "value", status),
+        "tags": list(tags or []),
+        "confidence_score": confidence_score,
+        "industry_id": str(industry_id) if industry_id else None,
+    }
+
+
+def _embedding_batches(texts: list[str]):
+    """Yield truncated texts grouped into provider-sized request batches."""
+    batch: list[str] = []
+    batch_tokens = 0
+    for text in texts:
+        text = text[:EMBEDDING_MAX_CHARS]
+        tokens = len(text) // 4 + 1  # rough token estimate
+        if batch and (
+            len(batch) >= settings.EMBEDDING_BATCH_SIZE
+            or batch_tokens + tokens > settings.EMBEDDING_BATCH_MAX_TOKENS
+        ):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+class KnowledgeBaseCore:
     """
-    Convert text to sparse vector representation (bag-of-words with hashed indices).
-    Used for keyword-based search to combine with dense semantic search via RRF.
+    Client-agnostic parts of the knowledge base: point ids, sparse vectors,
+    point/payload construction, filters and result shaping. Shared by the
+    sync KnowledgeBase (Celery) and AsyncKnowledgeBase (API request path).
     """
-    tokens = re.findall(r"\b\w{2,}\b", text.lower())[:500]  # limit tokens
-    if not tokens:
-        return [], []
-    counts = Counter(tokens)
-    indices = []
-    values = []
-    for token, count in counts.items():
-        idx = abs(hash(token)) % (2**31 - 1)
-        indices.append(idx)
-        values.append(float(count))
-    return indices, values
-
-
-class KnowledgeBase:
+
+    def _sparse_vector(self, collection_name: str, text: str) -> SparseVector:
+        """Generate BM25 document sparse vector for keyword search."""
+        indices, values = _SPARSE_ENCODERS[collection_name].encode_document(text)
+        if not indices:
+            return SparseVector(indices=[0], values=[0.0])
+        return SparseVector(indices=indices, values=values)
+
+    def _sparse_query_vector(self, collection_name: str, text: str) -> SparseVector:
+        """Generate sparse query vector (IDF is applied by Qdrant)."""
+        indices, values = _SPARSE_ENCODERS[collection_name].encode_query(text)
+        return SparseVector(indices=indices, values=values)
+
+    def _point_id(self, prefix: str, id: str) -> int:
+        return int(hashlib.md5(f"{prefix}:{id}".encode()).hexdigest(), 16) % (2**31)
+
+    def _chunk_point_id(self, transcript_id: str, text: str, occurrence: int = 0) -> int:
+        """Content-addressed: an unchanged chunk keeps its point across reprocessing."""
+        key = f"{transcript_id}:{content_hash(text)}"
+        return self._point_id("transcript", f"{key}:{occurrence}" if occurrence else key)
+
+    def _chunk_point_ids(self, transcript_id: str, chunks: list[str]) -> list[int]:
+        """Point ids for a transcript's chunks; each repeat of an identical passage gets its own point."""
+        seen: Counter[str] = Counter()
+        ids = []
+        for text in chunks:
+            digest = content_hash(text)
+            ids.append(self._chunk_point_id(transcript_id, text, seen[digest]))
+            seen[digest] += 1
+        return ids
+
+    def _vector(self, collection_name: str, dense: list[float], text: str, hybrid: bool):
+        """Named dense + sparse vectors for hybrid collections, bare dense vector for legacy ones."""
+        if not hybrid:
+            return dense
+        return {
+            settings.DENSE_VECTOR_NAME: dense,
+            settings.SPARSE_VECTOR_NAME: self._sparse_vector(collection_name, text),
+        }
+
+    def _transcript_chunk_points(
+        self,
+        transcript_id: str,
+        company_id: str,
+        chunks: list[str],
+        dense_vectors: list[list[float]],
+        hybrid: bool,
+        metadata: Optional[dict] = None,
+        start_index: int = 0,
+        point_ids: Optional[list[int]] = None,
+    ) -> list[PointStruct]:
+        point_ids = point_ids or self._chunk_point_ids(transcript_id, chunks)
+        return [
+            PointStruct(
+                id=point_id,
+                vector=self._vector(settings.TRANSCRIPTS_COLLECTION, dense, text, hybrid),
+                payload={
+                    "transcript_id": transcript_id,
+                    "company_id": company_id,
+                    "chunk_index": chunk_index,
+                    "content_hash": content_hash(text),
+                    "text": text[:2000],
+                    **(metadata or {}),
+                },
+            )
+            for chunk_index, (point_id, text, dense) in enumerate(zip(point_ids, chunks, dense_vectors), start_index)
+        ]
+
+    def _use_case_text(self, use_case: dict) -> str:
+        return f"{use_case['title']}\n\n{use_case['description']}"
+
+    def _use_case_points(
+        self,
+        use_cases: list[dict],
+        dense_vectors: list[list[float]],
+        hybrid: bool,
+    ) -> list[PointStruct]:
+        return [
+            PointStruct(
+                id=self._point_id("usecase", uc["use_case_id"]),
+                vector=self._vector(settings.USE_CASES_COLLECTION, dense, self._use_case_text(uc), hybrid),
+                payload={
+                    "use_case_id": uc["use_case_id"],
+                    "company_id": uc["company_id"],
+                    "title": uc["title"],
+                    "description": uc["description"][:2000],
+                    **(uc.get("metadata") or {}),
+                },
+            )
+            for uc, dense in zip(use_cases, dense_vectors)
+        ]
+
+    def _qdrant_filter(self, company_id: Optional[str] = None) -> Optional[Filter]:
+        if not company_id:
+            return None
+        return Filter(
+            must=[FieldCondition(key="company_id", match=MatchValue(value=company_id))]
+        )
+
+    def _use_case_filter(
+        self,
+        company_id: Optional[str] = None,
+        industry_id: Optional[str] = None,
+        status: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        min_confidence: Optional[float] = None,
+    ) -> Optional[Filter]:
+        """Payload filter for use case search; tags match any of the given tags."""
+        must = [
+            FieldCondition(key=key, match=MatchValue(value=str(value)))
+            for key, value in (("company_id", company_id), ("industry_id", industry_id), ("status", status))
+            if value
+        ]
+        if tags:
+            must.append(FieldCondition(key="tags", match=MatchAny(any=list(tags))))
+        if min_confidence:
+            must.append(FieldCondition(key="confidence_score", range=Range(gte=min_confidence)))
+        return Filter(must=must) if must else None
+
+    def _similar_filter(
+        self,
+        point_id: int,
+        company_id: Optional[str] = None,
+        industry_id: Optional[str] = None,
+    ) -> Filter:
+        """Scope for nearest neighbours of a point; the point itself is excluded server-side."""
+        scope = self._use_case_filter(company_id=company_id, industry_id=industry_id)
+        return Filter(
+            must=scope.must if scope else None,
+            must_not=[HasIdCondition(has_id=[point_id])],
+        )
+
+    def _transcript_filter(self, transcript_id: str) -> Filter:
+        return Filter(
+            must=[FieldCondition(key="transcript_id", match=MatchValue(value=transcript_id))]
+        )
+
+    def _hybrid_prefetch(
+        self,
+        dense_vector: list[float],
+        sparse_vector: SparseVector,
+        q_filter: Optional[Filter],
+        limit: int = 0,
+    ) -> list[Prefetch]:
+        """
+        Dense + sparse candidate lists fused with RRF: score = sum(1 / (k + rank_i)).
+        Each list holds at least INITIAL_K candidates, more when the caller wants more results.
+        """
+        candidates = max(settings.INITIAL_K, limit)
+        return [
+            Prefetch(
+                query=dense_vector,
+                using=settings.DENSE_VECTOR_NAME,
+                limit=candidates,
+                filter=q_filter,
+            ),
+            Prefetch(
+                query=sparse_vector,
+                using=settings.SPARSE_VECTOR_NAME,
+                limit=candidates,
+                filter=q_filter,
+            ),
+        ]
+
+    def _to_results(self, points) -> list[dict]:
+        return [
+            {
+                "score": point.score if point.score else 0.0,
+                "payload": point.payload or {},
+            }
+            for point in points
+        ]
+
+
+class KnowledgeBase(KnowledgeBaseCore):
     """
     Manages transcript and use case embeddings in Qdrant.
     Performs hybrid search using Reciprocal Rank Fusion (RRF) to combine
@@ -58,94 +328,91 @@ class KnowledgeBase:
     def __init__(self, qdrant_url: str):
         self.client = QdrantClient(url=qdrant_url, check_compatibility=False)
         self.openai = get_openai_client()
+        self.embedding_cache = get_embedding_cache()
 
     def _embed(self, text: str) -> list[float]:
         """Generate dense embedding for text."""
-        resp = self.openai.embeddings.create(model=settings.EMBEDDING_MODEL, input=text[:8000])
-        return resp.data[0].embedding
+        return self.embed_batch([text])[0]
 
-    def _sparse_vector(self, text: str) -> SparseVector:
-        """Generate sparse vector from text for keyword search."""
-        indices, values = _text_to_sparse_indices_values(text)
-        if not indices:
-            return SparseVector(indices=[0], values=[0.0])
-        return SparseVector(indices=indices, values=values)
-
-    def _point_id(self, prefix: str, id: str) -> int:
-        return int(hashlib.md5(f"{prefix}:{id}".encode()).hexdigest(), 16) % (2**31)
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate dense embeddings for many texts. Cached vectors are reused;
+        the rest go out one request per batch, bounded by EMBEDDING_BATCH_SIZE
+        and EMBEDDING_BATCH_MAX_TOKENS.
+        """
+        texts = [text[:EMBEDDING_MAX_CHARS] for text in texts]
+        embeddings = self.embedding_cache.get_many(texts)
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            fresh: list[list[float]] = []
+            for batch in _embedding_batches(missing_texts):
+                resp = self.openai.embeddings.create(model=settings.EMBEDDING_MODEL, input=batch)
+                fresh.extend(item.embedding for item in sorted(resp.data, key=lambda d: d.index))
+            self.embedding_cache.set_many(missing_texts, fresh)
+            for i, vector in zip(missing, fresh):
+                embeddings[i] = vector
+        return embeddings
 
     def _create_payload_indexes(self, collection_name: str):
         """Create payload indexes for fast filtering."""
-        try:
-            for field_name, schema_type in [
-                ("company_id", PayloadSchemaType.KEYWORD),
-                ("transcript_id", PayloadSchemaType.KEYWORD),
-                ("use_case_id", PayloadSchemaType.KEYWORD),
-            ]:
+        for field_name, schema_type in PAYLOAD_INDEXES:
+            try:
                 self.client.create_payload_index(
                     collection_name=collection_name,
                     field_name=field_name,
                     field_schema=schema_type,
                 )
                 logger.info(f"Created payload index {field_name} on {collection_name}")
-        except Exception as e:
-            logger.warning(f"Payload index creation (may already exist): {e}")
+            except Exception as e:
+                logger.warning(f"Payload index creation (may already exist) | field={field_name} | error={e}")
 
     def _supports_hybrid(self, collection_name: str) -> bool:
-        """Check if collection has named vectors (dense + sparse) for hybrid search."""
+        """
+        Check if collection has named vectors (dense + sparse) for hybrid search.
+        The answer is cached per process; see invalidate_schema_cache.
+        """
+        cached = _hybrid_schema_cache.get(collection_name)
+        if cached is not None:
+            return cached
         try:
             info = self.client.get_collection(collection_name)
-            params = getattr(info.config, "params", None)
-            if not params or not params.vectors:
-                return False
-            vectors = params.vectors
-            if isinstance(vectors, dict):
-                return settings.DENSE_VECTOR_NAME in vectors and settings.SPARSE_VECTOR_NAME in vectors
-            return False
         except Exception:
             return False
+        return _cache_schema(collection_name, info)
 
-    def ensure_transcripts_collection(self):
-        """Create transcripts collection with dense + sparse vectors and indexes."""
+    def _ensure_collection(self, collection_name: str):
+        """Create a collection with dense + sparse vectors and indexes if missing."""
         try:
-            self.client.get_collection(settings.TRANSCRIPTS_COLLECTION)
-            logger.info(f"Collection {settings.TRANSCRIPTS_COLLECTION} already exists")
+            info = self.client.get_collection(collection_name)
         except Exception:
-            self.client.create_collection(
-                collection_name=settings.TRANSCRIPTS_COLLECTION,
-                vectors_config={
-                    settings.DENSE_VECTOR_NAME: VectorParams(
-                        size=settings.VECTOR_SIZE,
-                        distance=Distance.COSINE,
-                    )
-                },
-                sparse_vectors_config={
-                    settings.SPARSE_VECTOR_NAME: SparseVectorParams(),
-                },
-            )
-            self._create_payload_indexes(settings.TRANSCRIPTS_COLLECTION)
-            logger.info(f"Created collection {settings.TRANSCRIPTS_COLLECTION} with hybrid vectors")
+            self._create_collection(collection_name)
+            return
+        _cache_schema(collection_name, info)
+        logger.info(f"Collection {collection_name} already exists")
+        # Indexes added since the collection was created (creation is idempotent)
+        self._create_payload_indexes(collection_name)
+
+    def _create_collection(self, collection_name: str):
+        self.client.create_collection(collection_name=collection_name, **_collection_config())
+        _hybrid_schema_cache[collection_name] = True
+        self._create_payload_indexes(collection_name)
+        logger.info(f"Created collection {collection_name} with hybrid vectors")
+
+    def ensure_transcripts_collection(self):
+        """Create transcripts collection with dense + sparse vectors and indexes."""
+        self._ensure_collection(settings.TRANSCRIPTS_COLLECTION)
 
     def ensure_use_cases_collection(self):
         """Create use_cases collection with dense + sparse vectors and indexes."""
-        try:
-            self.client.get_collection(settings.USE_CASES_COLLECTION)
-            logger.info(f"Collection {settings.USE_CASES_COLLECTION} already exists")
-        except Exception:
-            self.client.create_collection(
-                collection_name=settings.USE_CASES_COLLECTION,
-                vectors_config={
-                    settings.DENSE_VECTOR_NAME: VectorParams(
-                        size=settings.VECTOR_SIZE,
-                        distance=Distance.COSINE,
-                    )
-                },
-                sparse_vectors_config={
-                    settings.SPARSE_VECTOR_NAME: SparseVectorParams(),
-                },
-            )
-            self._create_payload_indexes(settings.USE_CASES_COLLECTION)
-            logger.info(f"Created collection {settings.USE_CASES_COLLECTION} with hybrid vectors")
+        self._ensure_collection(settings.USE_CASES_COLLECTION)
+
+    def recreate_collection(self, collection_name: str):
+        """Drop and recreate a collection with the hybrid schema. All points are lost."""
+        invalidate_schema_cache(collection_name)
+        if self.client.collection_exists(collection_name):
+            self.client.delete_collection(collection_name)
+        self._create_collection(collection_name)
 
     def upsert_transcript_chunk(
         self,
@@ -156,24 +423,11 @@ class KnowledgeBase:
         metadata: Optional[dict] = None,
     ):
         """Upsert a transcript chunk with dense and sparse vectors (or dense only for legacy)."""
-        point_id = self._point_id("transcript", f"{transcript_id}:{chunk_index}")
-        dense = self._embed(text)
-        payload = {
-            "transcript_id": transcript_id,
-            "company_id": company_id,
-            "chunk_index": chunk_index,
-            "text": text[:2000],
-            **(metadata or {}),
-        }
-        if self._supports_hybrid(settings.TRANSCRIPTS_COLLECTION):
-            sparse = self._sparse_vector(text)
-            vector = {settings.DENSE_VECTOR_NAME: dense, settings.SPARSE_VECTOR_NAME: sparse}
-        else:
-            vector = dense
-        self.client.upsert(
-            collection_name=settings.TRANSCRIPTS_COLLECTION,
-            points=[{"id": point_id, "vector": vector, "payload": payload}],
+        hybrid = self._supports_hybrid(settings.TRANSCRIPTS_COLLECTION)
+        points = self._transcript_chunk_points(
+            transcript_id, company_id, [text], [self._embed(text)], hybrid, metadata, chunk_index
         )
+        self._upsert_points(settings.TRANSCRIPTS_COLLECTION, points)
 
     def upsert_use_case(
         self,
@@ -184,33 +438,218 @@ class KnowledgeBase:
         metadata: Optional[dict] = None,
     ):
         """Upsert a use case with dense and sparse vectors (or dense only for legacy)."""
-        point_id = self._point_id("usecase", use_case_id)
-        text = f"{title}\n\n{description}"
-        dense = self._embed(text)
-        payload = {
+        self.upsert_use_cases([{
             "use_case_id": use_case_id,
             "company_id": company_id,
             "title": title,
-            "description": description[:2000],
-            **(metadata or {}),
+            "description": description,
+            "metadata": metadata,
+        }])
+
+    def upsert_transcript_chunks(
+        self,
+        transcript_id: str,
+        company_id: str,
+        chunks: list[str],
+        metadata: Optional[dict] = None,
+    ):
+        """Bulk upsert transcript chunks: batched embeddings and batched Qdrant writes."""
+        if not chunks:
+            return
+        hybrid = self._supports_hybrid(settings.TRANSCRIPTS_COLLECTION)
+        dense_vectors = self.embed_batch(chunks)
+        points = self._transcript_chunk_points(
+            transcript_id, company_id, chunks, dense_vectors, hybrid, metadata
+        )
+        self._upsert_points(settings.TRANSCRIPTS_COLLECTION, points)
+
+    def sync_transcript_chunks(
+        self,
+        transcript_id: str,
+        company_id: str,
+        chunks: list[str],
+        metadata: Optional[dict] = None,
+        chunk_metadata: Optional[list[dict]] = None,
+    ) -> dict:
+        """
+        Incrementally bring a transcript's points in line with `chunks`.
+        Points are keyed by content hash (and occurrence, so a repeated passage
+        keeps one point per repeat), so only new chunks are embedded and
+        written, unchanged chunks that moved get a chunk_index payload update,
+        and chunks that vanished are deleted. `chunk_metadata` (one dict per
+        chunk, e.g. speaker-turn ranges) is merged over `metadata`.
+        """
+        def payload_for(idx: int) -> dict:
+            return {**(metadata or {}), **(chunk_metadata[idx] if chunk_metadata else {})}
+
+        existing = {
+            point.id: (point.payload or {}).get("chunk_index")
+            for point in self._scroll_transcript_points(transcript_id, ["chunk_index"])
         }
-        if self._supports_hybrid(settings.USE_CASES_COLLECTION):
-            sparse = self._sparse_vector(text)
-            vector = {settings.DENSE_VECTOR_NAME: dense, settings.SPARSE_VECTOR_NAME: sparse}
-        else:
-            vector = dense
-        self.client.upsert(
-            collection_name=settings.USE_CASES_COLLECTION,
-            points=[{"id": point_id, "vector": vector, "payload": payload}],
+        desired = {pid: idx for idx, pid in enumerate(self._chunk_point_ids(transcript_id, chunks))}
+
+        added = [idx for pid, idx in desired.items() if pid not in existing]
+        moved = [(pid, idx) for pid, idx in desired.items() if pid in existing and existing[pid] != idx]
+        removed = [pid for pid in existing if pid not in desired]
+
+        if added:
+            hybrid = self._supports_hybrid(settings.TRANSCRIPTS_COLLECTION)
+            point_ids = {idx: pid for pid, idx in desired.items()}
+            texts = [chunks[idx] for idx in added]
+            dense_vectors = self.embed_batch(texts)
+            points = [
+                point
+                for idx, text, dense in zip(added, texts, dense_vectors)
+                for point in self._transcript_chunk_points(
+                    transcript_id, company_id, [text], [dense], hybrid, payload_for(idx), idx, [point_ids[idx]]
+                )
+            ]
+            self._upsert_points(settings.TRANSCRIPTS_COLLECTION, points)
+        if moved:
+            self.client.batch_update_points(
+                collection_name=settings.TRANSCRIPTS_COLLECTION,
+                update_operations=[
+                    SetPayloadOperation(set_payload=SetPayload(payload={"chunk_index": idx, **payload_for(idx)}, points=[pid]))
+                    for pid, idx in moved
+                ],
+            )
+        if removed:
+            self.client.delete(
+                collection_name=settings.TRANSCRIPTS_COLLECTION,
+                points_selector=removed,
+            )
+        return {
+            "added": len(added),
+            "moved": len(moved),
+            "removed": len(removed),
+            "unchanged": len(desired) - len(added) - len(moved),
+        }
+
+    def upsert_use_cases(self, use_cases: list[dict]):
+        """
+        Bulk upsert use cases. Each item needs use_case_id, company_id, title and
+        description; an optional "metadata" dict is merged into the payload.
+        """
+        if not use_cases:
+            return
+        hybrid = self._supports_hybrid(settings.USE_CASES_COLLECTION)
+        dense_vectors = self.embed_batch([self._use_case_text(uc) for uc in use_cases])
+        points = self._use_case_points(use_cases, dense_vectors, hybrid)
+        self._upsert_points(settings.USE_CASES_COLLECTION, points)
+
+    def _upsert_points(self, collection_name: str, points: list[PointStruct]):
+        """
+        Write points in UPSERT_BATCH_SIZE slices. A failed write may mean the
+        cached schema is stale (vector shape mismatch), so drop it before re-raising.
+        """
+        try:
+            for i in range(0, len(points), settings.UPSERT_BATCH_SIZE):
+                self.client.upsert(
+                    collection_name=collection_name,
+                    points=points[i : i + settings.UPSERT_BATCH_SIZE],
+                )
+        except Exception:
+            invalidate_schema_cache(collection_name)
+            raise
+
+    def enable_sparse_idf(self, collection_name: str) -> bool:
+        """
+        Switch an existing collection's sparse vector to server-side IDF weighting.
+        Returns False (and changes nothing) for legacy dense-only collections.
+        """
+        if not self._supports_hybrid(collection_name):
+            logger.warning(f"No sparse vectors, IDF modifier not applicable | collection={collection_name}")
+            return False
+        self.client.update_collection(
+            collection_name=collection_name,
+            sparse_vectors_config={
+                settings.SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF),
+            },
         )
+        logger.info(f"Enabled sparse IDF modifier on {collection_name}")
+        return True
 
-    def _qdrant_filter(self, company_id: Optional[str] = None) -> Optional[Filter]:
-        if not company_id:
-            return None
-        return Filter(
-            must=[FieldCondition(key="company_id", match=MatchValue(value=company_id))]
+    def _scroll_transcript_points(self, transcript_id: str, with_payload: list[str]):
+        """Every point of a transcript, with only the given payload fields."""
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=settings.TRANSCRIPTS_COLLECTION,
+                scroll_filter=self._transcript_filter(transcript_id),
+                limit=settings.UPSERT_BATCH_SIZE,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=False,
+            )
+            yield from points
+            if offset is None:
+                return
+
+    def reencode_transcript_sparse(self, transcript_id: str, chunks: list[str]) -> int:
+        """
+        Rewrite only the sparse vectors of a transcript's existing points (dense
+        vectors untouched); returns the number of points rewritten. Points are
+        found by scrolling, not by recomputing ids, so legacy and stale points
+        are covered too. A point is encoded from the chunk in `chunks` with its
+        content_hash, else from its stored payload text.
+        """
+        full_texts = {content_hash(text): text for text in chunks}
+        items = []
+        for point in self._scroll_transcript_points(transcript_id, ["content_hash", "text"]):
+            payload = point.payload or {}
+            text = full_texts.get(payload.get("content_hash")) or payload.get("text")
+            if text:
+                items.append((point.id, text))
+        self._update_sparse_vectors(settings.TRANSCRIPTS_COLLECTION, items)
+        return len(items)
+
+    def reencode_use_cases_sparse(self, use_cases: list[dict]):
+        """Rewrite only the sparse vectors of use cases (items need use_case_id, title, description)."""
+        self._update_sparse_vectors(
+            settings.USE_CASES_COLLECTION,
+            [(self._point_id("usecase", uc["use_case_id"]), self._use_case_text(uc)) for uc in use_cases],
+        )
+
+    def set_use_case_payloads(self, payloads: dict[str, dict]):
+        """
+        Merge payload fields into existing use case points (use_case_id -> fields);
+        vectors untouched. Selected by filter so use cases without a point are skipped.
+        """
+        operations = [
+            SetPayloadOperation(set_payload=SetPayload(
+                payload=payload,
+                filter=Filter(must=[FieldCondition(key="use_case_id", match=MatchValue(value=use_case_id))]),
+            ))
+            for use_case_id, payload in payloads.items()
+        ]
+        for i in range(0, len(operations), settings.UPSERT_BATCH_SIZE):
+            self.client.batch_update_points(
+                collection_name=settings.USE_CASES_COLLECTION,
+                update_operations=operations[i : i + settings.UPSERT_BATCH_SIZE],
+            )
+
+    def set_company_industry(self, company_id: str, industry_id: str):
+        """Point every use case of a company at its (new) industry in one filtered payload update."""
+        self.client.set_payload(
+            collection_name=settings.USE_CASES_COLLECTION,
+            payload={"industry_id": industry_id},
+            points=self._qdrant_filter(company_id),
         )
 
+    def _update_sparse_vectors(self, collection_name: str, items: list[tuple[int, str]]):
+        points = [
+            PointVectors(
+                id=point_id,
+                vector={settings.SPARSE_VECTOR_NAME: self._sparse_vector(collection_name, text)},
+            )
+            for point_id, text in items
+        ]
+        for i in range(0, len(points), settings.UPSERT_BATCH_SIZE):
+            self.client.update_vectors(
+                collection_name=collection_name,
+                points=points[i : i + settings.UPSERT_BATCH_SIZE],
+            )
+
     def _hybrid_search(
         self,
         collection_name: str,
@@ -223,46 +662,42 @@ class KnowledgeBase:
         dense vector search with text-based sparse search.
         RRF Formula: score = sum(1 / (k + rank_i)) for each ranking
         """
-        q_filter = self._qdrant_filter(company_id)
-        dense_vector = self._embed(query)
+        return self._hybrid_search_with_vector(
+            collection_name, query, self._embed(query), limit, self._qdrant_filter(company_id)
+        )
 
+    def _hybrid_search_with_vector(
+        self,
+        collection_name: str,
+        query: str,
+        dense_vector: list[float],
+        limit: int,
+        q_filter: Optional[Filter],
+    ) -> list[dict]:
+        """Hybrid search with a precomputed query embedding."""
         if not self._supports_hybrid(collection_name):
             return self._dense_only_search(
                 collection_name, dense_vector, limit, q_filter
             )
 
-        sparse_vector = self._sparse_vector(query)
+        sparse_vector = self._sparse_query_vector(collection_name, query)
+        if not sparse_vector.indices:
+            # Query is all stop words / punctuation: nothing for the keyword leg
+            return self._dense_only_search(
+                collection_name, dense_vector, limit, q_filter
+            )
         try:
             results = self.client.query_points(
                 collection_name=collection_name,
-                prefetch=[
-                    Prefetch(
-                        query=dense_vector,
-                        using=settings.DENSE_VECTOR_NAME,
-                        limit=settings.INITIAL_K,
-                        filter=q_filter,
-                    ),
-                    Prefetch(
-                        query=sparse_vector,
-                        using=settings.SPARSE_VECTOR_NAME,
-                        limit=settings.INITIAL_K,
-                        filter=q_filter,
-                    ),
-                ],
+                prefetch=self._hybrid_prefetch(dense_vector, sparse_vector, q_filter, limit),
                 query=FusionQuery(fusion=Fusion.RRF),
                 limit=limit,
                 with_payload=True,
             )
-
-            return [
-                {
-                    "score": point.score if point.score else 0.0,
-                    "payload": point.payload or {},
-                }
-                for point in results.points
-            ]
+            return self._to_results(results.points)
         except Exception as e:
             logger.warning(f"Hybrid search failed, falling back to dense only: {e}")
+            invalidate_schema_cache(collection_name)
             return self._dense_only_search(
                 collection_name, dense_vector, limit, q_filter
             )
@@ -273,28 +708,26 @@ class KnowledgeBase:
         dense_vector: list[float],
         limit: int,
         q_filter: Optional[Filter],
+        score_threshold: Optional[float] = None,
     ) -> list[dict]:
         """Fallback when collection has single vector or hybrid fails."""
-        try:
-            results = self.client.search(
-                collection_name=collection_name,
-                query_vector=dense_vector,
-                limit=limit,
-                query_filter=q_filter,
-            )
-            return [{"score": r.score, "payload": r.payload} for r in results]
-        except Exception:
+        last_error = None
+        for using in (None, settings.DENSE_VECTOR_NAME):
             try:
-                results = self.client.search(
+                results = self.client.query_points(
                     collection_name=collection_name,
-                    query_vector=(settings.DENSE_VECTOR_NAME, dense_vector),
+                    query=dense_vector,
+                    using=using,
                     limit=limit,
                     query_filter=q_filter,
+                    score_threshold=score_threshold,
+                    with_payload=True,
                 )
-                return [{"score": r.score, "payload": r.payload} for r in results]
+                return self._to_results(results.points)
             except Exception as e:
-                logger.error(f"Dense search failed: {e}")
-                return []
+                last_error = e
+        logger.error(f"Dense search failed: {last_error}")
+        return []
 
     def search_transcripts(
         self, query: str, limit: int = 5, company_id: Optional[str] = None
@@ -305,22 +738,81 @@ class KnowledgeBase:
         )
 
     def search_use_cases(
-        self, query: str, limit: int = 5, company_id: Optional[str] = None
+        self,
+        query: str,
+        limit: int = 5,
+        company_id: Optional[str] = None,
+        filters: Optional[dict] = None,
+        score_threshold: Optional[float] = None,
     ):
-        """Hybrid search over use cases."""
-        return self._hybrid_search(
-            settings.USE_CASES_COLLECTION, query, limit, company_id
+        """
+        Hybrid search over use cases; filters are _use_case_filter keyword arguments.
+        With score_threshold the ranking is dense only: RRF scores are rank based,
+        so only cosine similarity can be held to a threshold.
+        """
+        q_filter = self._use_case_filter(company_id=company_id, **(filters or {}))
+        dense_vector = self._embed(query)
+        if score_threshold is not None:
+            return self._dense_only_search(
+                settings.USE_CASES_COLLECTION, dense_vector, limit, q_filter, score_threshold
+            )
+        return self._hybrid_search_with_vector(
+            settings.USE_CASES_COLLECTION, query, dense_vector, limit, q_filter
         )
 
+    def similar_use_cases(
+        self,
+        use_case_id: str,
+        limit: int = 10,
+        company_id: Optional[str] = None,
+        industry_id: Optional[str] = None,
+        score_threshold: Optional[float] = None,
+    ) -> Optional[list[dict]]:
+        """
+        Nearest neighbours of a stored use case by its dense vector (query by point id:
+        no re-embedding). None when the use case has no point yet; [] when the
+        query fails for any other reason.
+        """
+        collection_name = settings.USE_CASES_COLLECTION
+        point_id = self._point_id("usecase", use_case_id)
+        try:
+            results = self.client.query_points(
+                collection_name=collection_name,
+                query=point_id,
+                using=settings.DENSE_VECTOR_NAME if self._supports_hybrid(collection_name) else None,
+                query_filter=self._similar_filter(point_id, company_id, industry_id),
+                score_threshold=score_threshold,
+                limit=limit,
+                with_payload=True,
+            )
+        except Exception as e:
+            if self._point_missing(collection_name, point_id):
+                return None
+            logger.warning(f"Similar use case query failed | use_case_id={use_case_id} | error={e}")
+            return []
+        return self._to_results(results.points)
+
+    def _point_missing(self, collection_name: str, point_id: int) -> bool:
+        """True only when Qdrant confirms the point does not exist."""
+        try:
+            points = self.client.retrieve(
+                collection_name=collection_name, ids=[point_id], with_payload=False, with_vectors=False
+            )
+        except Exception:
+            return False
+        return not points
+
     def search_all(
         self, query: str, limit: int = 10, company_id: Optional[str] = None
     ):
-        """Search both transcripts and use cases with hybrid RRF."""
-        transcripts = self.search_transcripts(
-            query, limit=limit // 2, company_id=company_id
+        """Search both transcripts and use cases with hybrid RRF, embedding the query once."""
+        dense_vector = self._embed(query)
+        q_filter = self._qdrant_filter(company_id)
+        transcripts = self._hybrid_search_with_vector(
+            settings.TRANSCRIPTS_COLLECTION, query, dense_vector, limit // 2, q_filter
         )
-        use_cases = self.search_use_cases(
-            query, limit=limit // 2, company_id=company_id
+        use_cases = self._hybrid_search_with_vector(
+            settings.USE_CASES_COLLECTION, query, dense_vector, limit // 2, q_filter
         )
         return {"transcripts": transcripts, "use_cases": use_cases}
 
@@ -328,13 +820,7 @@ class KnowledgeBase:
         """Delete all chunks for a transcript."""
         self.client.delete(
             collection_name=settings.TRANSCRIPTS_COLLECTION,
-            points_selector=Filter(
-                must=[
-                    FieldCondition(
-                        key="transcript_id", match=MatchValue(value=transcript_id)
-                    )
-                ]
-            ),
+            points_selector=self._transcript_filter(transcript_id),
         )
 
     def delete_use_case(self, use_case_id: str):
@@ -1,11 +1,56 @@
 """
 PDF to Markdown conversion.
 Extracts text from PDF and formats as markdown preserving structure.
+Pages can be converted in independent ranges (one Celery task per range) and
+assembled afterwards in page order. split_pdf cuts the document into one small
+PDF per range up front, so each range task parses only its own pages.
 """
 import io
-from typing import Optional
+from typing import Iterable, Optional
 
-from pypdf import PdfReader
+from pypdf import PdfReader, PdfWriter
+
+PAGE_SEPARATOR = "\n---\n"
+
+
+def page_count(pdf_bytes: bytes) -> int:
+    return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+
+
+def split_pdf(pdf_bytes: bytes, pages_per_part: int) -> list[bytes]:
+    """One standalone PDF per consecutive range of pages_per_part pages."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    parts = []
+    for start in range(0, len(reader.pages), pages_per_part):
+        writer = PdfWriter()
+        for page in reader.pages[start : start + pages_per_part]:
+            writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        parts.append(buffer.getvalue())
+    return parts
+
+
+def _page_markdown(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    # Normalize whitespace but preserve paragraph breaks
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    return "\n\n".join(paragraphs)
+
+
+def pages_to_markdown(pdf_bytes: bytes, start: int = 0, end: Optional[int] = None) -> list[str]:
+    """Markdown for pages [start, end); empty string for pages without text."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    end = len(reader.pages) if end is None else min(end, len(reader.pages))
+    return [_page_markdown(reader.pages[i].extract_text()) for i in range(start, end)]
+
+
+def assemble_markdown(pages: Iterable[str], filename: Optional[str] = None) -> str:
+    """Join per-page markdown (in page order) into one document."""
+    parts = [f"# Document: {filename}\n"] if filename else []
+    parts.append(PAGE_SEPARATOR.join(page for page in pages if page))
+    return "\n".join(parts).strip()
 
 
 def pdf_to_markdown(pdf_bytes: bytes, filename: Optional[str] = None) -> str:
@@ -13,22 +58,4 @@ def pdf_to_markdown(pdf_bytes: bytes, filename: Optional[str] = None) -> str:
     Convert PDF content to markdown text.
     Extracts text page by page and preserves paragraph structure.
     """
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    lines: list[str] = []
-
-    if filename:
-        lines.append(f"# Document: {filename}\n")
-
-    for i, page in enumerate(reader.pages):
-        text = page.extract_text()
-        if not text:
-            continue
-        # Normalize whitespace but preserve paragraph breaks
-        paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
-        for para in paragraphs:
-            lines.append(para)
-            lines.append("")  # blank line between paragraphs
-        if i < len(reader.pages) - 1:
-            lines.append("\n---\n")  # page separator
-
-    return "\n".join(lines).strip()
+    return assemble_markdown(pages_to_markdown(pdf_bytes, 0, page_count(pdf_bytes)), filename)
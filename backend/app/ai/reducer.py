@@ -0,0 +1,218 @@
+"""
+REDUCE phase: merge and deduplicate the use cases extracted per chunk.
+
+Two strategies (settings.REDUCE_STRATEGY):
+- "tree": reduce fixed-size batches in parallel, then merge up to REDUCE_FAN_IN
+  results per call level by level. Every call gets at most REDUCE_BATCH_SIZE use
+  cases. Once regrouping would no longer put two outputs into one prompt (or at
+  REDUCE_MAX_DEPTH), a last concurrent pass reduces each output against compact
+  summaries of the outputs before it, so duplicates across batches still merge.
+- "window": the original serial moving window that re-sends everything
+  accumulated so far with each batch.
+
+With DEDUP_ENABLED and an embedding function, near-duplicates are first resolved
+by app.ai.dedup and only the ambiguous clusters are sent to the LLM.
+"""
+import json
+import logging
+from typing import Callable, Optional
+
+from app.ai.chains import ExtractedUseCase, create_reduction_chain
+from app.ai.dedup import prededuplicate
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[dict], None]
+EmbedBatch = Callable[[list[str]], list[list[float]]]
+
+
+def _batch_json(use_cases: list[ExtractedUseCase]) -> str:
+    return json.dumps([uc.model_dump() for uc in use_cases], default=str)
+
+
+def _flatten(groups: list[list[ExtractedUseCase]]) -> list[ExtractedUseCase]:
+    return [uc for group in groups for uc in group]
+
+
+def _summaries(use_cases: list[ExtractedUseCase]) -> str:
+    """Compact already_extracted list: titles and the start of each description."""
+    return json.dumps([{"title": u.title, "description": u.description[:200]} for u in use_cases], default=str)
+
+
+def _regroup(
+    reduced: list[list[ExtractedUseCase]], fan_in: int, batch_size: int
+) -> list[tuple[list[ExtractedUseCase], int]]:
+    """
+    Next level's groups: consecutive outputs, at most fan_in of them and batch_size
+    use cases per group. Each group comes with the number of outputs it draws from.
+    """
+    groups: list[tuple[list[ExtractedUseCase], int]] = []
+    current: list[ExtractedUseCase] = []
+    sources: set[int] = set()
+    for index, output in enumerate(reduced):
+        for i in range(0, len(output), batch_size):
+            piece = output[i : i + batch_size]
+            if current and (len(sources | {index}) > fan_in or len(current) + len(piece) > batch_size):
+                groups.append((current, len(sources)))
+                current, sources = [], set()
+            current = current + piece
+            sources.add(index)
+    if current:
+        groups.append((current, len(sources)))
+    return groups
+
+
+def _cross_reduce(
+    reduced: list[list[ExtractedUseCase]], reduction_chain
+) -> list[ExtractedUseCase]:
+    """
+    Global pass over outputs that are too large to share a prompt: each output is
+    reduced against compact summaries of all outputs before it, so every pair of
+    outputs is compared once and the calls still run concurrently.
+    """
+    outputs = reduction_chain.batch(
+        [
+            {"text": _batch_json(output), "already_extracted": _summaries(_flatten(reduced[:i]))}
+            for i, output in enumerate(reduced[1:], start=1)
+        ],
+        config={"max_concurrency": settings.LLM_MAX_CONCURRENCY},
+    )
+    return reduced[0] + _flatten([output.use_cases for output in outputs])
+
+
+def tree_reduce(
+    use_cases: list[ExtractedUseCase],
+    batch_size: int,
+    fan_in: int,
+    max_depth: int,
+    on_progress: Optional[ProgressCallback] = None,
+) -> list[ExtractedUseCase]:
+    """
+    Reduce batches concurrently, then merge up to fan_in outputs per call while
+    that still brings different outputs into one prompt. Whatever is left after
+    that is merged by one global pass (_cross_reduce), which is the last level.
+    """
+    reduction_chain = create_reduction_chain()
+    groups = [(use_cases[i : i + batch_size], 1) for i in range(0, len(use_cases), batch_size)]
+    level = 0
+    while True:
+        level += 1
+        # A group drawn from a single output was reduced as a whole already
+        pending = [i for i, (_, sources) in enumerate(groups) if level == 1 or sources > 1]
+        outputs = reduction_chain.batch(
+            [{"text": _batch_json(groups[i][0]), "already_extracted": "(none yet)"} for i in pending],
+            config={"max_concurrency": settings.LLM_MAX_CONCURRENCY},
+        )
+        reduced = [group for group, _ in groups]
+        for i, output in zip(pending, outputs):
+            reduced[i] = output.use_cases
+        accumulated = sum(len(r) for r in reduced)
+        logger.info(
+            f"REDUCE level done | level={level} | calls={len(pending)} | groups={len(groups)} | accumulated={accumulated}"
+        )
+        if on_progress:
+            on_progress({"level": level, "groups": len(groups), "accumulated": accumulated})
+
+        reduced = [r for r in reduced if r]
+        if len(reduced) <= 1:
+            return _flatten(reduced)
+        if level >= max_depth:
+            logger.warning(f"REDUCE reached max depth | depth={max_depth} | groups_left={len(reduced)}")
+            return _flatten(reduced)
+
+        next_groups = _regroup(reduced, fan_in, batch_size)
+        merges = any(sources > 1 for _, sources in next_groups)
+        if merges and (level + 1 < max_depth or len(next_groups) == 1):
+            groups = next_groups
+            continue
+
+        result = _cross_reduce(reduced, reduction_chain)
+        logger.info(f"REDUCE cross-batch pass done | level={level + 1} | outputs={len(reduced)} | accumulated={len(result)}")
+        if on_progress:
+            on_progress({"level": level + 1, "groups": len(reduced), "accumulated": len(result)})
+        return result
+
+
+def window_reduce(
+    use_cases: list[ExtractedUseCase],
+    batch_size: int,
+    on_progress: Optional[ProgressCallback] = None,
+) -> list[ExtractedUseCase]:
+    """Serial moving window: each batch is reduced against everything accumulated so far."""
+    reduction_chain = create_reduction_chain()
+    accumulated: list[ExtractedUseCase] = []
+    already_extracted_str = ""
+    for i in range(0, len(use_cases), batch_size):
+        batch = use_cases[i : i + batch_size]
+        reduced_result = reduction_chain.invoke({
+            "text": _batch_json(batch),
+            "already_extracted": already_extracted_str or "(none yet)",
+        })
+        accumulated.extend(reduced_result.use_cases)
+        already_extracted_str = _summaries(accumulated)
+        if on_progress:
+            on_progress({"batch": i // batch_size + 1, "accumulated": len(accumulated)})
+    return accumulated
+
+
+def reduce_clusters(
+    clusters: list[list[ExtractedUseCase]],
+    batch_size: int,
+    on_progress: Optional[ProgressCallback] = None,
+) -> list[ExtractedUseCase]:
+    """Reduce each cluster on its own (concurrently); clusters are never merged with each other."""
+    if not clusters:
+        return []
+    reduction_chain = create_reduction_chain()
+    groups = [cluster[i : i + batch_size] for cluster in clusters for i in range(0, len(cluster), batch_size)]
+    outputs = reduction_chain.batch(
+        [{"text": _batch_json(group), "already_extracted": "(none yet)"} for group in groups],
+        config={"max_concurrency": settings.LLM_MAX_CONCURRENCY},
+    )
+    reduced = _flatten([output.use_cases for output in outputs])
+    if on_progress:
+        on_progress({"clusters": len(clusters), "accumulated": len(reduced)})
+    return reduced
+
+
+def _full_reduce(
+    use_cases: list[ExtractedUseCase],
+    on_progress: Optional[ProgressCallback] = None,
+) -> list[ExtractedUseCase]:
+    if settings.REDUCE_STRATEGY == "window":
+        return window_reduce(use_cases, settings.REDUCE_BATCH_SIZE, on_progress)
+    return tree_reduce(
+        use_cases,
+        settings.REDUCE_BATCH_SIZE,
+        max(2, settings.REDUCE_FAN_IN),
+        max(1, settings.REDUCE_MAX_DEPTH),
+        on_progress,
+    )
+
+
+def reduce_use_cases(
+    use_cases: list[ExtractedUseCase],
+    on_progress: Optional[ProgressCallback] = None,
+    embed_batch: Optional[EmbedBatch] = None,
+) -> list[ExtractedUseCase]:
+    """Merge duplicates across chunks: embedding pre-dedup when possible, else the configured strategy."""
+    if not use_cases:
+        return []
+    if not (settings.DEDUP_ENABLED and embed_batch):
+        return _full_reduce(use_cases, on_progress)
+
+    try:
+        resolved, ambiguous = prededuplicate(
+            use_cases,
+            embed_batch,
+            settings.DEDUP_CLUSTER_THRESHOLD,
+            settings.DEDUP_MERGE_THRESHOLD,
+        )
+    except Exception as e:
+        logger.warning(f"Pre-dedup failed, reducing everything with the LLM | error={e}")
+        return _full_reduce(use_cases, on_progress)
+
+    if on_progress:
+        on_progress({"resolved": len(resolved), "ambiguous_clusters": len(ambiguous)})
+    return resolved + reduce_clusters(ambiguous, settings.REDUCE_BATCH_SIZE, on_progress)
@@ -0,0 +1,70 @@
+"""
+Deterministic sparse (BM25-style) text encoding for Qdrant hybrid search.
+Token indices come from a stable hash, so vectors written by the Celery worker
+match query vectors built in the API process. Documents carry BM25 TF
+saturation; IDF is applied server-side by Qdrant (Modifier.IDF).
+"""
+import re
+import hashlib
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r"[^\W_]{2,}", re.UNICODE)
+
+STOP_WORDS = frozenset(
+    # English
+    "a about above after again against all also am an and any are as at be because been before being "
+    "below between both but by can could did do does doing down during each few for from further had "
+    "has have having he her here hers herself him himself his how if in into is it its itself just "
+    "let me more most my myself no nor not now of off on once only or other our ours ourselves out "
+    "over own same she should so some such than that the their theirs them themselves then there "
+    "these they this those through to too under until up very was we were what when where which "
+    "while who whom why will with would you your yours yourself yourselves yes okay ok yeah um uh "
+    # German
+    "aber alle als also am an auch auf aus bei bin bis bist da dann das dass dem den der des die "
+    "doch du ein eine einem einen einer eines er es für hat habe haben ich ihr im in ist ja kann "
+    "mit nach nicht noch nur oder sich sie sind so um und uns von vor war was wie wir wird zu zum zur".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens (2+ chars) with stop words removed."""
+    return [t for t in TOKEN_PATTERN.findall(text.casefold()) if t not in STOP_WORDS]
+
+
+def token_index(token: str) -> int:
+    """Stable 32-bit index for a token (independent of PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+class SparseEncoder:
+    """
+    BM25 encoder producing Qdrant sparse vectors.
+    Document weight: tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avg_doc_len)).
+    Query weight: 1.0 per distinct term, so the fused score is sum(IDF * doc weight).
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_len: float = 256.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_len = avg_doc_len
+
+    def _term_counts(self, text: str) -> tuple[Counter, int]:
+        tokens = tokenize(text)
+        counts: Counter = Counter()
+        for token in tokens:
+            counts[token_index(token)] += 1
+        return counts, len(tokens)
+
+    def encode_document(self, text: str) -> tuple[list[int], list[float]]:
+        counts, doc_len = self._term_counts(text)
+        if not counts:
+            return [], []
+        norm = self.k1 * (1 - self.b + self.b * doc_len / self.avg_doc_len)
+        indices = list(counts.keys())
+        values = [tf * (self.k1 + 1) / (tf + norm) for tf in counts.values()]
+        return indices, values
+
+    def encode_query(self, text: str) -> tuple[list[int], list[float]]:
+        counts, _ = self._term_counts(text)
+        indices = list(counts.keys())
+        return indices, [1.0] * len(indices)
@@ -1,3 +1,4 @@
-from app.clients.openai_client import get_openai_client, get_chat_llm
+from app.clients.openai_client import get_openai_client, get_async_openai_client, get_chat_llm
+from app.clients.redis_client import get_redis, get_async_redis
 
-__all__ = ["get_openai_client", "get_chat_llm"]
+__all__ = ["get_openai_client", "get_async_openai_client", "get_chat_llm", "get_redis", "get_async_redis"]
@@ -2,7 +2,7 @@
 Centralized OpenAI client for OpenRouter (OpenAI-compatible API).
 Single source for embeddings and chat LLM across the app.
 """
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from langchain_openai import ChatOpenAI
 
 from app.config import settings
@@ -10,6 +10,7 @@ from app.config import settings
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 
 _openai_client: OpenAI | None = None
+_async_openai_client: AsyncOpenAI | None = None
 
 
 def get_openai_client() -> OpenAI:
@@ -23,6 +24,17 @@ def get_openai_client() -> OpenAI:
     return _openai_client
 
 
+def get_async_openai_client() -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client (OpenRouter) for the API event loop."""
+    global _async_openai_client
+    if _async_openai_client is None:
+        _async_openai_client = AsyncOpenAI(
+            api_key=settings.OPENROUTER_API_KEY,
+            base_url=OPENROUTER_BASE_URL,
+        )
+    return _async_openai_client
+
+
 def get_chat_llm(
     model: str | None = None,
     temperature: float = 0.3,
@@ -0,0 +1,34 @@
+"""
+Shared Redis clients.
+One connection pool per process (redis-py resets it after a fork); the async
+client is for the API event loop.
+"""
+from redis import ConnectionPool, Redis
+from redis import asyncio as aioredis
+
+from app.config import settings
+
+_redis_pool: ConnectionPool | None = None
+_async_redis: aioredis.Redis | None = None
+
+
+def get_redis() -> Redis:
+    """Return a Redis client backed by the process-wide connection pool."""
+    global _redis_pool
+    if _redis_pool is None:
+        _redis_pool = ConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+    return Redis(connection_pool=_redis_pool)
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Return the shared redis.asyncio client for the API process."""
+    global _async_redis
+    if _async_redis is None:
+        _async_redis = aioredis.Redis.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+    return _async_redis
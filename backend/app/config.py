@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     DATABASE_SYNC_URL: str = config["DATABASE_SYNC_URL"]
 
     REDIS_URL: str = config["REDIS_URL"]
+    REDIS_MAX_CONNECTIONS: int = 50  # Per process; shared by progress events and pipeline state
     QDRANT_URL: str = config["QDRANT_URL"]
     OPENROUTER_API_KEY: str = config["OPENROUTER_API_KEY"]
     SECRET: str = config["SECRET_KEY"]
@@ -26,6 +27,43 @@ class Settings(BaseSettings):
     DENSE_VECTOR_NAME: str = "dense"
     SPARSE_VECTOR_NAME: str = "sparse"
     INITIAL_K: int = 20  # Results per prefetch before RRF fusion
+    SPARSE_BM25_K1: float = 1.2
+    SPARSE_BM25_B: float = 0.75
+    TRANSCRIPTS_AVG_DOC_LEN: float = 2500  # Avg content tokens per transcript chunk
+    USE_CASES_AVG_DOC_LEN: float = 60  # Avg content tokens per use case (title + description)
+    EMBEDDING_BATCH_SIZE: int = 128  # Max inputs per embeddings request
+    EMBEDDING_BATCH_MAX_TOKENS: int = 250_000  # Max (estimated) tokens per embeddings request
+    UPSERT_BATCH_SIZE: int = 256  # Max points per Qdrant upsert call
+    EMBEDDING_CACHE_SIZE: int = 2048  # In-process LRU entries
+    EMBEDDING_CACHE_TTL: int = 7 * 24 * 3600  # Redis tier TTL (seconds)
+
+    # Transcript processing
+    PDF_MAX_BYTES: int = 50 * 1024 * 1024  # Uploads above this are rejected with 413
+    PDF_MAX_PAGES: int = 500  # PDFs with more pages fail conversion
+    PDF_PAGES_PER_TASK: int = 20  # Page range converted by one Celery task
+    PDF_UPLOAD_TTL: int = 3600  # Seconds the uploaded PDF bytes stay in Redis awaiting conversion
+    CHUNK_STRATEGY: str = "auto"  # "auto" (turns when speaker-structured), "turns" or "paragraphs"
+    CHUNK_SIZE: int | None = None  # Tokens per chunk; None uses the chat model's default (app.ai.chunker)
+    CHUNK_OVERLAP: int | None = None  # Overlap tokens; None uses the chat model's default
+    SSE_HEARTBEAT_INTERVAL: float = 15.0  # Seconds between keep-alive comments on idle progress streams
+    PROGRESS_STREAM_MAXLEN: int = 500  # Approximate cap of the per-transcript replay stream
+    PROGRESS_STREAM_TTL: int = 24 * 3600  # Replay stream expiry after the last event
+    PROGRESS_COALESCE_WINDOW: float = 0.5  # Seconds; chunk_done/reducing events within it collapse to the latest
+    LLM_MAX_CONCURRENCY: int = 4  # Max in-flight LLM calls per transcript (MAP tasks and each REDUCE level)
+    REDUCE_STRATEGY: str = "tree"  # "tree" (parallel, level by level) or "window" (serial moving window)
+    REDUCE_BATCH_SIZE: int = 15  # Raw use cases per first-level reduce call
+    REDUCE_FAN_IN: int = 4  # Reduced groups merged per call at each higher level
+    REDUCE_MAX_DEPTH: int = 4  # Stop merging after this many levels and concatenate what is left
+    PIPELINE_STATE_TTL: int = 24 * 3600  # Chunks and MAP results kept in Redis between pipeline tasks
+    EXTRACT_CHUNK_MAX_RETRIES: int = 3  # Retries of a single chunk extraction before the transcript fails
+    DEDUP_ENABLED: bool = True  # Embedding-based pre-dedup; only ambiguous clusters reach the LLM reduce
+    DEDUP_CLUSTER_THRESHOLD: float = 0.80  # Cosine similarity that links two use cases into a cluster
+    DEDUP_MERGE_THRESHOLD: float = 0.92  # Clusters whose least similar pair is above this merge without the LLM
+
+    # Search
+    FUZZY_SEARCH_THRESHOLD: float = 0.3  # pg_trgm word_similarity needed for a fuzzy name/title match
+    SIMILAR_SCORE_THRESHOLD: float = 0.5  # Min cosine similarity for /search/similar neighbours
+    THEME_CACHE_TTL: int = 600  # Seconds a cross-industry theme's ranked use case ids stay cached in Redis
 
 
 settings = Settings()
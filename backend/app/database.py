@@ -1,6 +1,6 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from app.config import settings
 from app.models import Base
 
@@ -37,6 +37,8 @@ async def get_async_session():
 async def create_db_tables():
     """Create all tables (called in startup)"""
     async with async_engine.begin() as conn:
+        # gin_trgm_ops indexes need the extension; on a fresh database migration 0005 has not run yet
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
 
 
@@ -5,6 +5,7 @@ from app.handlers.transcripts import router as transcripts_router
 from app.handlers.use_cases import router as use_cases_router
 from app.handlers.comments import router as comments_router
 from app.handlers.search import router as search_router
+from app.handlers.admin import router as admin_router
 
 
 __all__ = [
@@ -15,4 +16,5 @@ __all__ = [
     "use_cases_router",
     "comments_router",
     "search_router",
+    "admin_router",
 ]
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_session
+from app.schemas import UserResponse
+from app.repository import ExtractionCacheRepository
+from app.utils.permissions import require_admin
+from app.ai.chains import MAP_PROMPT_VERSION
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/extraction-cache", response_model=dict)
+async def get_extraction_cache_stats(
+    current_user: UserResponse = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Cached MAP results per prompt version (admin only)"""
+    repo = ExtractionCacheRepository(db)
+    versions = await repo.count_by_prompt_version()
+    return {
+        "current_prompt_version": MAP_PROMPT_VERSION,
+        "versions": [{"prompt_version": v, "entries": count} for v, count in versions],
+    }
+
+
+@router.delete("/extraction-cache", response_model=dict)
+async def invalidate_extraction_cache(
+    prompt_version: str | None = None,
+    current_user: UserResponse = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Invalidate cached MAP results for a prompt version, or all of them if omitted (admin only)"""
+    repo = ExtractionCacheRepository(db)
+    deleted = await repo.delete_by_prompt_version(prompt_version)
+    await db.commit()
+    return {"prompt_version": prompt_version, "deleted": deleted}
@@ -13,9 +13,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import AsyncSessionLocal, get_async_session
 from app.services import TranscriptService, UseCaseService, CompanyService, ChatService
-from app.ai.knowledge_base import KnowledgeBase
+from app.ai.async_knowledge_base import get_async_knowledge_base
 from app.ai.agents.graph import create_chat_agent, stream_agent_response
-from app.tasks import process_transcript
+from app.tasks import process_transcript, stage_pdf_upload
 from app.schemas import TranscriptCreate
 from app.config import settings
 from app.dependencies import current_active_user
@@ -89,7 +89,7 @@ async def chat_websocket(websocket: WebSocket):
             transcript_service = TranscriptService(db)
             use_case_service = UseCaseService(db)
             company_service = CompanyService(db)
-            kb = KnowledgeBase(settings.QDRANT_URL)
+            kb = get_async_knowledge_base()
 
             context = {
                 "transcript_service": transcript_service,
@@ -137,8 +137,13 @@ async def chat_websocket(websocket: WebSocket):
                         file_bytes = base64.b64decode(b64)
                         ext = filename.lower().split(".")[-1] if "." in filename else ""
                         if ext == "pdf":
-                            from app.ai.pdf_converter import pdf_to_markdown
-                            text = pdf_to_markdown(file_bytes, filename)
+                            if len(file_bytes) > settings.PDF_MAX_BYTES:
+                                await websocket.send_json({
+                                    "type": "error",
+                                    "message": f"PDF exceeds {settings.PDF_MAX_BYTES // (1024 * 1024)} MB",
+                                })
+                                continue
+                            text = ""  # filled in by the PDF conversion tasks
                         else:
                             text = file_bytes.decode("utf-8", errors="ignore")
                         transcript_in = TranscriptCreate(
@@ -149,7 +154,10 @@ async def chat_websocket(websocket: WebSocket):
                         )
                         transcript = await transcript_service.create_transcript(transcript_in)
                         await transcript_service.commit()
-                        process_transcript.delay(str(transcript.id))
+                        if ext == "pdf":
+                            await stage_pdf_upload(str(transcript.id), file_bytes, filename)
+                        else:
+                            process_transcript.delay(str(transcript.id))
                         upload_msg = f"Transcript **{filename}** uploaded and processing started. You can track progress in the Transcripts tab."
                         await websocket.send_json({
                             "type": "message",
@@ -11,6 +11,7 @@ from app.repository import IndustryRepository
 from app.utils.permissions import require_maintainer, require_admin
 from app.utils.pagination import PaginationMixin
 from app.tasks.company_tasks import cleanup_company_data
+from app.tasks.knowledge_base_tasks import sync_company_industry
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/companies", tags=["companies"])
@@ -102,10 +103,15 @@ async def update_company(
 ):
     """Update a company"""
     service = CompanyService(db)
+    existing = await service.get_company(company_id)
+    previous_industry_id = existing.industry_id if existing else None
     company = await service.update_company(company_id, company_in)
     if not company:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
     await service.commit()
+    if company.industry_id != previous_industry_id:
+        # Use case points carry industry_id for /search filters
+        sync_company_industry.delay(str(company_id))
     return CompanyResponse.model_validate(company)
 
 
@@ -1,4 +1,5 @@
 from uuid import UUID
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_async_session
@@ -13,7 +14,7 @@ router = APIRouter(prefix="/industries", tags=["industries"])
 
 
 class IndustryListParams(PaginationMixin):
-    pass
+    q: Optional[str] = None
 
 
 @router.get("", response_model=dict)
@@ -21,9 +22,12 @@ async def list_industries(
     params: IndustryListParams = Depends(),
     db: AsyncSession = Depends(get_async_session),
 ):
-    """List all industries"""
+    """List all industries, or fuzzy-match names with q"""
     repo = IndustryRepository(db)
-    items, total = await repo.list(params.skip, params.limit)
+    if params.q:
+        items, total = await repo.search(params.q, params.skip, params.limit)
+    else:
+        items, total = await repo.list(params.skip, params.limit)
     await db.commit()
     return {
         "items": [IndustryResponse.model_validate(i) for i in items],
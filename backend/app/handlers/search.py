@@ -1,21 +1,30 @@
 from uuid import UUID
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from app.database import get_async_session
 from app.models import UseCase
+from app.models.enums import UseCaseStatus
 from app.schemas import UseCaseResponse
-from app.services import UseCaseService
+from app.services import UseCaseService, SearchService
 from app.utils.pagination import PaginationMixin
 
 router = APIRouter(prefix="/search", tags=["search"])
 
 
+class SearchFilters(BaseModel):
+    company_id: Optional[UUID] = None
+    industry_id: Optional[UUID] = None
+    status: Optional[UseCaseStatus] = None
+    tags: Optional[list[str]] = None  # Matches use cases with any of these tags
+    min_confidence: Optional[float] = None
+
+
 class SearchQuery(BaseModel):
     query: str
-    filters: Optional[dict] = None
-    limit: int = 10
+    filters: Optional[SearchFilters] = None
+    limit: int = Field(10, ge=1, le=100)
 
 
 @router.post("/use-cases", response_model=dict)
@@ -24,18 +33,15 @@ async def search_use_cases(
     db: AsyncSession = Depends(get_async_session),
 ):
     """Hybrid semantic + keyword search for use cases"""
-    service = UseCaseService(db)
-    
-    items, total = await service.search_use_cases(
-        search_in.query,
-        skip=0,
-        limit=search_in.limit,
-    )
-    
+    service = SearchService(db)
+    filters = search_in.filters.model_dump(mode="json", exclude_none=True) if search_in.filters else None
+
+    items = await service.search_use_cases(search_in.query, limit=search_in.limit, filters=filters)
+
     await db.commit()
     return {
         "items": [UseCaseResponse.model_validate(uc) for uc in items],
-        "total": total,
+        "total": len(items),
     }
 
 
@@ -43,9 +49,12 @@ async def search_use_cases(
 async def find_similar(
     use_case_id: UUID,
     limit: int = 10,
+    company_id: Optional[UUID] = None,
+    industry_id: Optional[UUID] = None,
+    min_score: Optional[float] = None,
     db: AsyncSession = Depends(get_async_session),
 ):
-    """Find use cases similar to a given one"""
+    """Find use cases similar to a given one (nearest neighbours of its stored vector)"""
     service = UseCaseService(db)
     
     # Get the reference UC
@@ -53,11 +62,13 @@ async def find_similar(
     if not ref_uc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Use case not found")
     
-    # Search by description keywords
-    items, total = await service.search_use_cases(ref_uc.title, skip=0, limit=limit)
-    
-    # Filter out the original
-    items = [uc for uc in items if uc.id != use_case_id]
+    items = await SearchService(db).similar_use_cases(
+        ref_uc,
+        limit=limit,
+        company_id=company_id,
+        industry_id=industry_id,
+        score_threshold=min_score,
+    )
     
     await db.commit()
     return {
@@ -69,27 +80,27 @@ async def find_similar(
 @router.post("/cross-industry")
 async def cross_industry_theme(
     theme: str,
+    limit: int = Query(100, ge=1, le=200),
+    per_industry: Optional[int] = Query(None, ge=1),
     db: AsyncSession = Depends(get_async_session),
 ):
     """
     Surface a theme across industries.
+    per_industry keeps only the top matches of each industry; counts are always complete.
     """
-    service = UseCaseService(db)
-    
-    # Search by theme
-    items, total = await service.search_use_cases(theme, skip=0, limit=100)
-    
-    # Group by industry
+    service = SearchService(db)
+    rows = await service.cross_industry(theme, limit=limit, per_industry=per_industry)
+
     by_industry = {}
-    for uc in items:
-        industry_name = uc.company.industry.name if uc.company and uc.company.industry else "Unknown"
-        if industry_name not in by_industry:
-            by_industry[industry_name] = []
-        by_industry[industry_name].append(UseCaseResponse.model_validate(uc))
-    
+    industry_counts = {}
+    for uc, industry_name, industry_count in rows:
+        by_industry.setdefault(industry_name, []).append(UseCaseResponse.model_validate(uc))
+        industry_counts[industry_name] = industry_count
+
     await db.commit()
     return {
         "theme": theme,
         "by_industry": by_industry,
-        "total_count": len(items),
+        "industry_counts": industry_counts,
+        "total_count": sum(industry_counts.values()),
     }
@@ -1,6 +1,6 @@
 from uuid import UUID
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_async_session
@@ -11,7 +11,8 @@ from app.services import TranscriptService
 from app.utils.permissions import require_maintainer, require_admin
 from app.utils.pagination import PaginationMixin
 from app.utils.sse import subscribe_to_transcript_progress
-from app.tasks import process_transcript
+from app.tasks import process_transcript, stage_pdf_upload
+from app.config import settings
 from app.celery_app import celery_app
 
 router = APIRouter(prefix="/transcripts", tags=["transcripts"])
@@ -54,17 +55,25 @@ async def upload_transcript(
     current_user: UserResponse = Depends(require_maintainer),
     db: AsyncSession = Depends(get_async_session),
 ):
-    """Upload a transcript and trigger AI extraction. Supports .txt, .md, .doc, .docx, .pdf."""
+    """
+    Upload a transcript and trigger AI extraction. Supports .txt, .md, .doc, .docx, .pdf.
+    PDFs are converted by the workers; the request returns once the file is stored.
+    """
     service = TranscriptService(db)
     
-    content = await file.read()
     filename = file.filename or "transcript.txt"
     ext = filename.lower().split(".")[-1] if "." in filename else ""
 
     if ext == "pdf":
-        from app.ai.pdf_converter import pdf_to_markdown
-        text = pdf_to_markdown(content, filename)
+        content = await file.read(settings.PDF_MAX_BYTES + 1)
+        if len(content) > settings.PDF_MAX_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"PDF exceeds {settings.PDF_MAX_BYTES // (1024 * 1024)} MB",
+            )
+        text = ""  # filled in by the PDF conversion tasks
     else:
+        content = await file.read()
         text = content.decode("utf-8", errors="ignore")
     
     # Create transcript
@@ -78,9 +87,12 @@ async def upload_transcript(
     
     await service.commit()
     
-    # Trigger Celery task
-    task = process_transcript.delay(str(transcript.id))
-    transcript.task_id = task.id
+    # Trigger Celery task (PDF conversion first, which then starts processing)
+    if ext == "pdf":
+        transcript.task_id = await stage_pdf_upload(str(transcript.id), content, filename)
+    else:
+        task = process_transcript.delay(str(transcript.id))
+        transcript.task_id = task.id
     db.add(transcript)
     await db.commit()
     await db.refresh(transcript)
@@ -118,18 +130,20 @@ async def delete_transcript(
 @router.post("/{transcript_id}/reprocess")
 async def reprocess_transcript(
     transcript_id: UUID,
+    resume: bool = True,
     current_user: UserResponse = Depends(require_maintainer),
     db: AsyncSession = Depends(get_async_session),
 ):
-    """Retry transcript extraction"""
+    """Retry transcript extraction, resuming from finished chunks unless resume=false"""
     service = TranscriptService(db)
     transcript = await service.get_transcript(transcript_id)
     if not transcript:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transcript not found")
     
-    # Reset progress and trigger task
-    await service.update_progress(transcript_id, chunks_processed=0)
-    task = process_transcript.delay(str(transcript_id))
+    # Trigger task; progress is restored from checkpoints when resuming
+    if not resume:
+        await service.update_progress(transcript_id, chunks_processed=0)
+    task = process_transcript.delay(str(transcript_id), resume=resume)
     await service.update_task_id(transcript_id, task.id)
     await service.commit()
     
@@ -137,9 +151,25 @@ async def reprocess_transcript(
 
 
 @router.get("/{transcript_id}/events")
-async def transcript_progress(transcript_id: UUID):
-    """SSE stream for real-time transcript processing progress"""
+async def transcript_progress(
+    transcript_id: UUID,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """SSE stream for real-time transcript processing progress (resumable via Last-Event-ID)"""
+    service = TranscriptService(db)
+    transcript = await service.get_transcript(transcript_id)
+    if not transcript:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transcript not found")
+
+    # Already finished: replay what is left in the stream, then close
+    terminal_event = None
+    if transcript.status == TranscriptStatus.completed:
+        terminal_event = {"event": "completed"}
+    elif transcript.status == TranscriptStatus.failed:
+        terminal_event = {"event": "failed", "error": transcript.error_message}
+
     return StreamingResponse(
-        subscribe_to_transcript_progress(str(transcript_id)),
+        subscribe_to_transcript_progress(str(transcript_id), last_event_id, terminal_event),
         media_type="text/event-stream",
     )
@@ -8,7 +8,9 @@ from app.database import create_db_tables
 from app.dependencies import fastapi_users, auth_backend
 from app.schemas import UserResponse, UserCreate
 from app.ai.embedder import QdrantEmbedder
-from app.ai.knowledge_base import KnowledgeBase
+from app.ai.async_knowledge_base import get_async_knowledge_base
+from app.ai.embedding_cache import get_embedding_cache
+from app.utils.sse import get_progress_broadcaster
 from app.handlers import (
     industries_router,
     companies_router,
@@ -17,6 +19,7 @@ from app.handlers import (
     comments_router,
     search_router,
     users_router,
+    admin_router,
 )
 from app.handlers.chat import router as chat_router
 
@@ -27,17 +30,19 @@ async def lifespan(app: FastAPI):
     await create_db_tables()
     print("✓ Database tables created")
     embedder = QdrantEmbedder(settings.QDRANT_URL)
-    kb = KnowledgeBase(settings.QDRANT_URL)
+    kb = get_async_knowledge_base()
     try:
         # KB first so use_cases gets hybrid (dense+sparse) schema; embedder is legacy fallback
-        kb.ensure_transcripts_collection()
-        kb.ensure_use_cases_collection()
+        await kb.ensure_transcripts_collection()
+        await kb.ensure_use_cases_collection()
         embedder.ensure_collection_exists()
         print("✓ Qdrant collections initialized")
     except Exception as e:
         print(f"⚠ Qdrant init warning: {e}")
     yield
     print("🛑 Shutting down...")
+    await kb.close()
+    await get_progress_broadcaster().close()
 
 
 app = FastAPI(
@@ -73,12 +78,13 @@ app.include_router(use_cases_router)
 app.include_router(comments_router)
 app.include_router(search_router)
 app.include_router(users_router)
+app.include_router(admin_router)
 app.include_router(chat_router)
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "embedding_cache": get_embedding_cache().stats()}
 
 
 @app.get("/")
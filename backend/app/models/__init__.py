@@ -8,6 +8,7 @@ from app.models.use_case import UseCase
 from app.models.use_case_relation import UseCaseRelation
 from app.models.comment import Comment
 from app.models.chat_message import ChatMessage
+from app.models.extraction_cache import ExtractionCacheEntry
 
 __all__ = [
     "Base",
@@ -24,4 +25,5 @@ __all__ = [
     "UseCaseRelation",
     "Comment",
     "ChatMessage",
+    "ExtractionCacheEntry",
 ]
@@ -0,0 +1,18 @@
+import uuid
+from sqlalchemy import String, Float, JSON, UniqueConstraint
+from sqlalchemy.orm import mapped_column, Mapped
+from app.models.base import Base, TimestampMixin
+
+
+class ExtractionCacheEntry(TimestampMixin, Base):
+    """MAP-phase ExtractionResult for one chunk, keyed by (chunk, prompt, model, temperature)."""
+    __tablename__ = "extraction_cache"
+    __table_args__ = (
+        UniqueConstraint("chunk_hash", "prompt_version", "model", "temperature", name="uq_extraction_cache_key"),
+    )
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    chunk_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    model: Mapped[str] = mapped_column(String(255), nullable=False)
+    temperature: Mapped[float] = mapped_column(Float, nullable=False)
+    result: Mapped[dict] = mapped_column(JSON, nullable=False)
@@ -1,12 +1,24 @@
 import uuid
-from sqlalchemy import String, Text, ForeignKey, Enum as SAEnum, Float, Integer, JSON
+from sqlalchemy import String, Text, ForeignKey, Enum as SAEnum, Float, Integer, JSON, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from app.models.base import Base, TimestampMixin
 from app.models.enums import UseCaseStatus
 
+# Full-text document: title (A) > description (B) > tags (C)
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(tags::text, '')), 'C')"
+)
+
 
 class UseCase(TimestampMixin, Base):
     __tablename__ = "use_cases"
+    __table_args__ = (
+        Index("ix_use_cases_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_use_cases_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     title: Mapped[str] = mapped_column(String(512), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
@@ -25,6 +37,10 @@ class UseCase(TimestampMixin, Base):
 
     tags: Mapped[list | None] = mapped_column(JSON, default=list)
     qdrant_id: Mapped[str | None] = mapped_column(String(255))
+    # Maintained by Postgres; deferred so regular loads don't fetch it
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True), deferred=True
+    )
 
     company_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("companies.id"), nullable=False)
     transcript_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("transcripts.id"))
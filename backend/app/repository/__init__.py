@@ -6,6 +6,7 @@ from app.repository.transcript_repo import TranscriptRepository
 from app.repository.use_case_repo import UseCaseRepository
 from app.repository.comment_repo import CommentRepository
 from app.repository.chat_message_repo import ChatMessageRepository
+from app.repository.extraction_cache_repo import ExtractionCacheRepository
 
 __all__ = [
     "BaseRepository",
@@ -16,4 +17,5 @@ __all__ = [
     "UseCaseRepository",
     "CommentRepository",
     "ChatMessageRepository",
+    "ExtractionCacheRepository",
 ]
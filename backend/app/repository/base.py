@@ -2,13 +2,24 @@ from typing import TypeVar, Generic, Type
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, func, literal, or_, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from app.config import settings
 
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType")
 UpdateSchemaType = TypeVar("UpdateSchemaType")
 
 
+def escape_like(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def trigram_match(column, q: str):
+    """Substring or fuzzy (pg_trgm word_similarity) match; both served by a gin_trgm_ops index."""
+    return or_(column.ilike(f"%{escape_like(q)}%"), literal(q).op("<%")(column))
+
+
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, db_session: AsyncSession, model_class: Type[ModelType]):
         self.db = db_session
@@ -19,6 +30,19 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_many(self, ids: list[UUID], options=()) -> list[ModelType]:
+        """Rows for ids in one `id = ANY(:ids)` query, returned in the order of ids; missing ids are skipped."""
+        if not ids:
+            return []
+        stmt = (
+            select(self.model_class)
+            .where(self.model_class.id == any_(bindparam("ids", list(ids), type_=ARRAY(PG_UUID(as_uuid=True)))))
+            .options(*options)
+        )
+        result = await self.db.execute(stmt)
+        by_id = {obj.id: obj for obj in result.scalars().all()}
+        return [by_id[id] for id in ids if id in by_id]
+
     async def list(self, skip: int = 0, limit: int = 20) -> tuple[list[ModelType], int]:
         # Get total count
         count_stmt = select(func.count()).select_from(self.model_class)
@@ -58,6 +82,33 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         await self.db.flush()
         return True
 
+    async def set_similarity_threshold(self, threshold: float):
+        """Transaction-local pg_trgm.word_similarity_threshold used by the <% operator."""
+        await self.db.execute(
+            select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True))
+        )
+
+    async def fuzzy_search(
+        self, column, q: str, skip: int = 0, limit: int = 20, threshold: float | None = None
+    ) -> tuple[list[ModelType], int]:
+        """Rows whose `column` contains or resembles q, best word_similarity first."""
+        await self.set_similarity_threshold(threshold if threshold is not None else settings.FUZZY_SEARCH_THRESHOLD)
+        condition = trigram_match(column, q)
+        stmt = (
+            select(self.model_class, func.count().over().label("total"))
+            .where(condition)
+            .order_by(func.word_similarity(q, column).desc(), column)
+            .offset(skip)
+            .limit(limit)
+        )
+        rows = (await self.db.execute(stmt)).all()
+        if rows:
+            return [row[0] for row in rows], rows[0].total
+        if skip == 0:
+            return [], 0
+        count_stmt = select(func.count()).select_from(self.model_class).where(condition)
+        return [], (await self.db.execute(count_stmt)).scalar()
+
     async def commit(self):
         await self.db.commit()
 
@@ -23,16 +23,7 @@ class CompanyRepository(BaseRepository[Company, CompanyCreate, CompanyUpdate]):
         return items, total
 
     async def search(self, q: str, skip: int = 0, limit: int = 20) -> tuple[list[Company], int]:
-        count_stmt = (
-            select(func.count()).select_from(Company).where(Company.name.ilike(f"%{q}%"))
-        )
-        count_result = await self.db.execute(count_stmt)
-        total = count_result.scalar()
-
-        stmt = select(Company).where(Company.name.ilike(f"%{q}%")).offset(skip).limit(limit)
-        result = await self.db.execute(stmt)
-        items = result.scalars().all()
-        return items, total
+        return await self.fuzzy_search(Company.name, q, skip, limit)
 
     async def delete_company_cascade(self, company_id: UUID) -> bool:
         """Delete company and all related data (use_cases, transcripts, chat_messages)."""
@@ -0,0 +1,25 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+from app.models import ExtractionCacheEntry
+
+
+class ExtractionCacheRepository:
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def count_by_prompt_version(self) -> list[tuple[str, int]]:
+        stmt = (
+            select(ExtractionCacheEntry.prompt_version, func.count())
+            .group_by(ExtractionCacheEntry.prompt_version)
+            .order_by(func.count().desc())
+        )
+        result = await self.db.execute(stmt)
+        return [(version, count) for version, count in result.all()]
+
+    async def delete_by_prompt_version(self, prompt_version: str | None = None) -> int:
+        """Delete entries for one prompt version, or every entry when None."""
+        stmt = delete(ExtractionCacheEntry)
+        if prompt_version is not None:
+            stmt = stmt.where(ExtractionCacheEntry.prompt_version == prompt_version)
+        result = await self.db.execute(stmt)
+        return result.rowcount
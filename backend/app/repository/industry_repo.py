@@ -14,3 +14,7 @@ class IndustryRepository(BaseRepository[Industry, IndustryCreate, IndustryUpdate
         stmt = select(Industry).where(Industry.name == name)
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
+
+    async def search(self, q: str, skip: int = 0, limit: int = 20) -> tuple[list[Industry], int]:
+        return await self.fuzzy_search(Industry.name, q, skip, limit)
+
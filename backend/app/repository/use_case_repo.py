@@ -1,11 +1,25 @@
+import re
 from uuid import UUID
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from app.models import UseCase
+from sqlalchemy import select, func, and_, or_, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from app.config import settings
+from app.models import UseCase, Company, Industry
 from app.models.enums import UseCaseStatus
 from app.schemas import UseCaseCreate, UseCaseUpdate
-from app.repository.base import BaseRepository
+from app.repository.base import BaseRepository, trigram_match
+
+SEARCH_CONFIG = "english"
+_SEARCH_TERM = re.compile(r"[^\W_]+")
+
+
+def prefix_tsquery(q: str):
+    """AND of prefix-matched terms ("data pipe" -> 'data:* & pipe:*'); None if q has no terms."""
+    terms = _SEARCH_TERM.findall(q)
+    if not terms:
+        return None
+    return func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms))
 
 
 class UseCaseRepository(BaseRepository[UseCase, UseCaseCreate, UseCaseUpdate]):
@@ -97,22 +111,72 @@ class UseCaseRepository(BaseRepository[UseCase, UseCaseCreate, UseCaseUpdate]):
     async def search_by_title_or_description(
         self, q: str, skip: int = 0, limit: int = 20
     ) -> tuple[list[UseCase], int]:
-        count_stmt = (
-            select(func.count())
-            .select_from(UseCase)
-            .where(
-                (UseCase.title.ilike(f"%{q}%")) | (UseCase.description.ilike(f"%{q}%"))
-            )
-        )
-        count_result = await self.db.execute(count_stmt)
-        total = count_result.scalar()
+        """
+        Full-text search on the GIN-indexed search_vector, plus typo-tolerant
+        trigram matches on the title; ranked by the better of ts_rank_cd and
+        title word_similarity.
+        """
+        query = prefix_tsquery(q)
+        if query is None:
+            return [], 0
 
+        await self.set_similarity_threshold(settings.FUZZY_SEARCH_THRESHOLD)
+        condition = or_(UseCase.search_vector.op("@@")(query), trigram_match(UseCase.title, q))
+        rank = func.greatest(
+            func.ts_rank_cd(UseCase.search_vector, query),
+            func.word_similarity(q, UseCase.title),
+        )
         stmt = (
-            select(UseCase)
-            .where((UseCase.title.ilike(f"%{q}%")) | (UseCase.description.ilike(f"%{q}%")))
+            select(UseCase, func.count().over().label("total"))
+            .where(condition)
+            .order_by(rank.desc(), UseCase.created_at.desc())
             .offset(skip)
             .limit(limit)
         )
-        result = await self.db.execute(stmt)
-        items = result.scalars().all()
-        return items, total
+        rows = (await self.db.execute(stmt)).all()
+        if rows:
+            return [row[0] for row in rows], rows[0].total
+        if skip == 0:
+            return [], 0
+
+        # Page past the end: the window count has no row to ride on
+        count_stmt = select(func.count()).select_from(UseCase).where(condition)
+        total = (await self.db.execute(count_stmt)).scalar()
+        return [], total
+
+    async def group_by_industry(
+        self, ids: list[UUID], per_industry: Optional[int] = None
+    ) -> list[tuple[UseCase, str, int]]:
+        """
+        (use case, industry name, industry match count) for the given ids in one
+        use_cases -> companies -> industries query. Rows are grouped by industry,
+        largest group first, each group in the order of ids and cut to
+        per_industry rows; the count is the group's size before the cut.
+        """
+        if not ids:
+            return []
+        ids_param = bindparam("ids", list(ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+        ranked = (
+            select(
+                UseCase.id.label("use_case_id"),
+                Industry.name.label("industry_name"),
+                func.row_number().over(
+                    partition_by=Industry.id,
+                    order_by=func.array_position(ids_param, UseCase.id),
+                ).label("industry_rank"),
+                func.count().over(partition_by=Industry.id).label("industry_count"),
+            )
+            .join(Company, UseCase.company_id == Company.id)
+            .join(Industry, Company.industry_id == Industry.id)
+            .where(UseCase.id == any_(ids_param))
+            .subquery()
+        )
+        stmt = (
+            select(UseCase, ranked.c.industry_name, ranked.c.industry_count)
+            .join(ranked, UseCase.id == ranked.c.use_case_id)
+            .order_by(ranked.c.industry_count.desc(), ranked.c.industry_name, ranked.c.industry_rank)
+        )
+        if per_industry:
+            stmt = stmt.where(ranked.c.industry_rank <= per_industry)
+        rows = (await self.db.execute(stmt)).all()
+        return [(row[0], row.industry_name, row.industry_count) for row in rows]
@@ -1,85 +1,110 @@
+import hashlib
+import json
+import logging
 from typing import Optional
 from uuid import UUID
-from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, Distance, VectorParams, NamedVector, SparseVector
-import hashlib
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.clients import get_async_redis
+from app.ai.embedding_cache import normalize_text
+from app.ai.async_knowledge_base import AsyncKnowledgeBase, get_async_knowledge_base
+from app.models import UseCase
+from app.repository import UseCaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+def theme_cache_key(theme: str, limit: int) -> str:
+    digest = hashlib.sha256(normalize_text(theme).encode("utf-8")).hexdigest()
+    return f"search:theme:{limit}:{digest}"
 
 
 class SearchService:
-    """Wrapper around Qdrant hybrid search operations"""
-    
-    def __init__(self, qdrant_url: str):
-        self.client = QdrantClient(url=qdrant_url)
-        self.collection_name = "use_cases"
+    """
+    Hybrid (dense + BM25 sparse, RRF) use case search: Qdrant ranks, Postgres
+    supplies the rows in one `id = ANY(...)` query, in ranking order.
+    """
 
-    async def ensure_collection(self):
-        """Create collection if it doesn't exist"""
-        try:
-            await self.client.get_collection(self.collection_name)
-        except Exception:
-            # Collection doesn't exist, create it
-            await self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config={
-                    "dense": VectorParams(size=1536, distance=Distance.COSINE),
-                    # Sparse vectors for BM25-style keyword matching
-                    "sparse": {
-                        "datatype": "uint32",
-                        "index": {"on_disk": True},
-                    },
-                },
-            )
+    def __init__(self, db_session: AsyncSession, kb: Optional[AsyncKnowledgeBase] = None):
+        self.repo = UseCaseRepository(db_session)
+        self.kb = kb or get_async_knowledge_base()
 
-    async def embed_and_upsert(
-        self,
-        point_id: str,
-        dense_vector: list[float],
-        sparse_vector: dict,
-        payload: dict,
-    ):
-        """Upsert a point with dense + sparse vectors"""
-        point = PointStruct(
-            id=int(hashlib.md5(point_id.encode()).hexdigest(), 16) % (2**31),
-            vector={
-                "dense": dense_vector,
-                "sparse": SparseVector(
-                    indices=list(sparse_vector.keys()),
-                    values=list(sparse_vector.values()),
-                ),
-            },
-            payload=payload,
-        )
-        await self.client.upsert(
-            collection_name=self.collection_name,
-            points=[point],
-        )
+    async def _hydrate(self, hits: list[dict]) -> list[UseCase]:
+        """Postgres rows for Qdrant hits; points without a row (deleted use cases) drop out."""
+        ids = [UUID(hit["payload"]["use_case_id"]) for hit in hits if hit["payload"].get("use_case_id")]
+        return await self.repo.get_many(ids)
 
-    async def hybrid_search(
+    async def search_use_cases(
         self,
-        dense_vector: list[float],
-        sparse_indices: list[int],
-        sparse_values: list[float],
+        query: str,
         limit: int = 10,
         filters: Optional[dict] = None,
-    ) -> list[dict]:
-        """Hybrid search using RRF fusion"""
-        # This is a simplified implementation
-        # In production, use qdrant_client's proper fusion logic or implement RRF manually
-        try:
-            results = await self.client.search(
-                collection_name=self.collection_name,
-                query_vector=NamedVector(name="dense", vector=dense_vector),
-                limit=limit,
-                query_filter=filters,
+    ) -> list[UseCase]:
+        """filters: company_id, industry_id, status, tags (any of), min_confidence."""
+        hits = await self.kb.search_use_cases(query, limit, filters=filters)
+        return await self._hydrate(hits)
+
+    async def similar_use_cases(
+        self,
+        use_case: UseCase,
+        limit: int = 10,
+        company_id: Optional[UUID] = None,
+        industry_id: Optional[UUID] = None,
+        score_threshold: Optional[float] = None,
+    ) -> list[UseCase]:
+        """
+        Nearest neighbours of a use case from its stored vector, scoped to a
+        company / industry and above score_threshold. Falls back to a text
+        search, held to the same threshold, when the use case has not been
+        embedded yet.
+        """
+        threshold = settings.SIMILAR_SCORE_THRESHOLD if score_threshold is None else score_threshold
+        hits = await self.kb.similar_use_cases(
+            str(use_case.id),
+            limit,
+            company_id=str(company_id) if company_id else None,
+            industry_id=str(industry_id) if industry_id else None,
+            score_threshold=threshold,
+        )
+        if hits is None:
+            filters = {"company_id": company_id, "industry_id": industry_id}
+            hits = await self.kb.search_use_cases(
+                f"{use_case.title}\n\n{use_case.description}",
+                limit + 1,
+                filters={key: str(value) for key, value in filters.items() if value},
+                score_threshold=threshold,
             )
-            return [hit.payload for hit in results]
+        items = await self._hydrate(hits)
+        return [uc for uc in items if uc.id != use_case.id][:limit]
+
+    async def theme_use_case_ids(self, theme: str, limit: int = 100) -> list[UUID]:
+        """
+        Ranked ids of the use cases matching a theme, cached in Redis per
+        (normalized theme, limit) for THEME_CACHE_TTL. Redis errors count as misses.
+        Empty results are not cached: search swallows Qdrant errors as [].
+        """
+        redis = get_async_redis()
+        key = theme_cache_key(theme, limit)
+        try:
+            cached = await redis.get(key)
         except Exception as e:
-            print(f"Search error: {e}")
-            return []
+            logger.warning(f"Theme cache read failed | error={e}")
+            cached = None
+        if cached is not None:
+            return [UUID(id) for id in json.loads(cached)]
 
-    async def delete_point(self, point_id: int):
-        """Delete a point from Qdrant"""
-        await self.client.delete(
-            collection_name=self.collection_name,
-            points_selector=[point_id],
-        )
+        hits = await self.kb.search_use_cases(theme, limit)
+        ids = [hit["payload"]["use_case_id"] for hit in hits if hit["payload"].get("use_case_id")]
+        if ids:
+            try:
+                await redis.set(key, json.dumps(ids), ex=settings.THEME_CACHE_TTL)
+            except Exception as e:
+                logger.warning(f"Theme cache write failed | error={e}")
+        return [UUID(id) for id in ids]
+
+    async def cross_industry(
+        self, theme: str, limit: int = 100, per_industry: Optional[int] = None
+    ) -> list[tuple[UseCase, str, int]]:
+        """Theme matches grouped by industry (see UseCaseRepository.group_by_industry)."""
+        ids = await self.theme_use_case_ids(theme, limit)
+        return await self.repo.group_by_industry(ids, per_industry)
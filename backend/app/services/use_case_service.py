@@ -5,11 +5,21 @@ from app.models import UseCase
 from app.models.enums import UseCaseStatus
 from app.schemas import UseCaseCreate, UseCaseUpdate, UseCaseStatusUpdate, UseCaseScoresUpdate
 from app.repository import UseCaseRepository
+from app.tasks.knowledge_base_tasks import sync_use_case
 
 
 class UseCaseService:
+    """
+    Use case writes. Every write also queues a Qdrant sync (sync_use_case),
+    dispatched by commit() so search sees the change from any write path.
+    """
+
     def __init__(self, db_session: AsyncSession):
         self.repo = UseCaseRepository(db_session)
+        self._pending_sync: dict[UUID, bool] = {}  # use_case_id -> reembed
+
+    def _queue_sync(self, use_case_id: UUID, reembed: bool = True):
+        self._pending_sync[use_case_id] = self._pending_sync.get(use_case_id, False) or reembed
 
     def _compute_priority_score(self, use_case: UseCase) -> float | None:
         """
@@ -32,7 +42,9 @@ class UseCaseService:
         return numerator / denominator
 
     async def create_use_case(self, use_case_in: UseCaseCreate) -> UseCase:
-        return await self.repo.create(use_case_in)
+        uc = await self.repo.create(use_case_in)
+        self._queue_sync(uc.id)
+        return uc
 
     async def get_use_case(self, use_case_id: UUID) -> UseCase | None:
         return await self.repo.get(use_case_id)
@@ -78,7 +90,11 @@ class UseCaseService:
         return await self.repo.search_by_title_or_description(q, skip, limit)
 
     async def update_use_case(self, use_case_id: UUID, use_case_in: UseCaseUpdate) -> UseCase | None:
-        return await self.repo.update(use_case_id, use_case_in)
+        uc = await self.repo.update(use_case_id, use_case_in)
+        if uc:
+            fields = use_case_in.model_dump(exclude_unset=True)
+            self._queue_sync(use_case_id, reembed=bool(fields.keys() & {"title", "description"}))
+        return uc
 
     async def update_status(self, use_case_id: UUID, status_in: UseCaseStatusUpdate) -> UseCase | None:
         uc = await self.repo.get(use_case_id)
@@ -88,6 +104,7 @@ class UseCaseService:
         self.repo.db.add(uc)
         await self.repo.db.flush()
         await self.repo.db.refresh(uc)
+        self._queue_sync(use_case_id, reembed=False)
         return uc
 
     async def update_scores(self, use_case_id: UUID, scores_in: UseCaseScoresUpdate) -> UseCase | None:
@@ -118,7 +135,14 @@ class UseCaseService:
         return uc
 
     async def delete_use_case(self, use_case_id: UUID) -> bool:
-        return await self.repo.delete(use_case_id)
+        deleted = await self.repo.delete(use_case_id)
+        if deleted:
+            self._queue_sync(use_case_id)
+        return deleted
 
     async def commit(self):
+        """Commit, then queue the Qdrant syncs of the use cases written in this transaction."""
         await self.repo.commit()
+        pending, self._pending_sync = self._pending_sync, {}
+        for use_case_id, reembed in pending.items():
+            sync_use_case.delay(str(use_case_id), reembed=reembed)
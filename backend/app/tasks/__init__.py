@@ -1,4 +1,19 @@
 from app.tasks.transcript_tasks import process_transcript
 from app.tasks.company_tasks import cleanup_company_data
+from app.tasks.knowledge_base_tasks import (
+    reencode_sparse_vectors,
+    sync_use_case,
+    sync_company_industry,
+    backfill_use_case_payloads,
+)
+from app.tasks.pdf_tasks import stage_pdf_upload
 
-__all__ = ["process_transcript", "cleanup_company_data"]
+__all__ = [
+    "process_transcript",
+    "cleanup_company_data",
+    "reencode_sparse_vectors",
+    "sync_use_case",
+    "sync_company_industry",
+    "backfill_use_case_payloads",
+    "stage_pdf_upload",
+]
@@ -0,0 +1,179 @@
+"""
+Celery tasks for knowledge base maintenance.
+"""
+import logging
+from uuid import UUID
+
+from app.celery_app import celery_app
+from app.config import settings
+from app.database import SyncSessionLocal
+from app.ai.chunker import chunk_transcript
+from app.ai.knowledge_base import KnowledgeBase, use_case_metadata
+from app.models import Company, Transcript, UseCase
+from app.models.enums import TranscriptStatus
+
+logger = logging.getLogger(__name__)
+
+REENCODE_PAGE_SIZE = 200
+
+
+@celery_app.task
+def reencode_sparse_vectors():
+    """
+    Migrate existing points to the stable BM25 sparse encoding.
+    Enables Qdrant's IDF modifier on both collections, then rewrites only the
+    sparse vectors of the points that exist (no re-embedding): use cases from
+    their Postgres rows, transcript chunks from the chunk text or stored payload.
+    """
+    kb = KnowledgeBase(settings.QDRANT_URL)
+    db = SyncSessionLocal()
+    try:
+        # Collections with sparse vectors; a failed IDF switch still gets the re-encode
+        sparse_collections = set()
+        for collection_name in (settings.TRANSCRIPTS_COLLECTION, settings.USE_CASES_COLLECTION):
+            try:
+                if kb.enable_sparse_idf(collection_name):
+                    sparse_collections.add(collection_name)
+            except Exception as e:
+                logger.warning(f"Enabling sparse IDF failed | collection={collection_name} | error={e}")
+                sparse_collections.add(collection_name)
+
+        transcripts_done = 0
+        points_done = 0
+        offset = 0
+        while settings.TRANSCRIPTS_COLLECTION in sparse_collections:
+            rows = (
+                db.query(Transcript.id, Transcript.raw_text)
+                .filter(Transcript.status == TranscriptStatus.completed)
+                .order_by(Transcript.id)
+                .offset(offset)
+                .limit(REENCODE_PAGE_SIZE)
+                .all()
+            )
+            if not rows:
+                break
+            for transcript_id, raw_text in rows:
+                try:
+                    points_done += kb.reencode_transcript_sparse(str(transcript_id), chunk_transcript(raw_text))
+                    transcripts_done += 1
+                except Exception as e:
+                    logger.warning(f"Sparse re-encode failed | transcript_id={transcript_id} | error={e}")
+            offset += REENCODE_PAGE_SIZE
+
+        use_cases_done = 0
+        offset = 0
+        while settings.USE_CASES_COLLECTION in sparse_collections:
+            rows = (
+                db.query(UseCase.id, UseCase.title, UseCase.description)
+                .order_by(UseCase.id)
+                .offset(offset)
+                .limit(REENCODE_PAGE_SIZE)
+                .all()
+            )
+            if not rows:
+                break
+            try:
+                kb.reencode_use_cases_sparse([
+                    {"use_case_id": str(uc_id), "title": title, "description": description}
+                    for uc_id, title, description in rows
+                ])
+                use_cases_done += len(rows)
+            except Exception as e:
+                logger.warning(f"Sparse re-encode failed for use case page | offset={offset} | error={e}")
+            offset += REENCODE_PAGE_SIZE
+
+        logger.info(
+            f"Sparse re-encode completed | transcripts={transcripts_done} | points={points_done} | use_cases={use_cases_done}"
+        )
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=10)
+def sync_use_case(self, use_case_id: str, reembed: bool = True):
+    """
+    Bring a use case's Qdrant point in line with its Postgres row: re-embed
+    (title/description changed), only refresh the filterable payload, or delete
+    the point when the row is gone.
+    """
+    kb = KnowledgeBase(settings.QDRANT_URL)
+    db = SyncSessionLocal()
+    try:
+        row = (
+            db.query(UseCase, Company.industry_id)
+            .join(Company, UseCase.company_id == Company.id)
+            .filter(UseCase.id == UUID(use_case_id))
+            .first()
+        )
+        if row is None:
+            kb.delete_use_case(use_case_id)
+            logger.info(f"Use case point deleted | use_case_id={use_case_id}")
+            return
+        uc, industry_id = row
+        metadata = use_case_metadata(uc.status, uc.tags, uc.confidence_score, industry_id)
+        if reembed:
+            kb.upsert_use_cases([{
+                "use_case_id": use_case_id,
+                "company_id": str(uc.company_id),
+                "title": uc.title,
+                "description": uc.description,
+                "metadata": metadata,
+            }])
+        else:
+            kb.set_use_case_payloads({use_case_id: metadata})
+    except Exception as e:
+        logger.warning(f"Use case sync failed | use_case_id={use_case_id} | error={e}")
+        raise self.retry(exc=e)
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=10)
+def sync_company_industry(self, company_id: str):
+    """Refresh industry_id on a company's use case points after its industry changed."""
+    kb = KnowledgeBase(settings.QDRANT_URL)
+    db = SyncSessionLocal()
+    try:
+        industry_id = db.query(Company.industry_id).filter(Company.id == UUID(company_id)).scalar()
+        if industry_id is None:
+            return
+        kb.set_company_industry(company_id, str(industry_id))
+        logger.info(f"Use case industry refreshed | company_id={company_id} | industry_id={industry_id}")
+    except Exception as e:
+        logger.warning(f"Company industry sync failed | company_id={company_id} | error={e}")
+        raise self.retry(exc=e)
+    finally:
+        db.close()
+
+
+@celery_app.task
+def backfill_use_case_payloads():
+    """Write status, tags, confidence_score and industry_id onto existing use case points."""
+    kb = KnowledgeBase(settings.QDRANT_URL)
+    db = SyncSessionLocal()
+    try:
+        done = 0
+        offset = 0
+        while True:
+            rows = (
+                db.query(UseCase.id, UseCase.status, UseCase.tags, UseCase.confidence_score, Company.industry_id)
+                .join(Company, UseCase.company_id == Company.id)
+                .order_by(UseCase.id)
+                .offset(offset)
+                .limit(REENCODE_PAGE_SIZE)
+                .all()
+            )
+            if not rows:
+                break
+            try:
+                kb.set_use_case_payloads({
+                    str(uc_id): use_case_metadata(status, tags, confidence_score, industry_id)
+                    for uc_id, status, tags, confidence_score, industry_id in rows
+                })
+                done += len(rows)
+            except Exception as e:
+                logger.warning(f"Payload backfill failed for use case page | offset={offset} | error={e}")
+            offset += REENCODE_PAGE_SIZE
+        logger.info(f"Use case payload backfill completed | use_cases={done}")
+    finally:
+        db.close()
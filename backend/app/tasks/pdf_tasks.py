@@ -0,0 +1,143 @@
+"""
+Celery tasks for PDF uploads.
+
+The upload handler only stages the PDF bytes in Redis and returns. Conversion
+splits the PDF once into one small PDF per PDF_PAGES_PER_TASK pages and fans
+out over those parts; the chord callback assembles the markdown in page order,
+stores it as raw_text and starts process_transcript.
+"""
+import logging
+from typing import Optional
+from uuid import UUID
+
+from celery import chord, group
+from sqlalchemy.orm import Session
+
+from app.celery_app import celery_app
+from app.clients import get_async_redis, get_redis
+from app.config import settings
+from app.database import SyncSessionLocal
+from app.ai.pdf_converter import assemble_markdown, page_count, pages_to_markdown, split_pdf
+from app.models import Transcript
+from app.models.enums import TranscriptStatus
+from app.tasks.progress import publish_progress
+from app.tasks.transcript_tasks import set_transcript_failed, mark_transcript_failed, process_transcript
+
+logger = logging.getLogger(__name__)
+
+
+def pdf_upload_key(transcript_id: str) -> str:
+    return f"upload:{transcript_id}:pdf"
+
+
+def pdf_part_key(transcript_id: str, part: int) -> str:
+    return f"upload:{transcript_id}:pdf:{part}"
+
+
+async def stage_pdf_upload(transcript_id: str, pdf_bytes: bytes, filename: str) -> str:
+    """Store the PDF for the workers and queue its conversion; returns the task id."""
+    await get_async_redis().set(pdf_upload_key(transcript_id), pdf_bytes, ex=settings.PDF_UPLOAD_TTL)
+    return convert_pdf.delay(transcript_id, filename).id
+
+
+def _load_pdf(transcript_id: str, part: Optional[int] = None) -> bytes:
+    key = pdf_upload_key(transcript_id) if part is None else pdf_part_key(transcript_id, part)
+    pdf_bytes = get_redis().get(key)
+    if pdf_bytes is None:
+        raise RuntimeError("Uploaded PDF expired before conversion; please upload it again")
+    return pdf_bytes
+
+
+def _delete_pdf(transcript_id: str, parts: int = 0):
+    get_redis().delete(pdf_upload_key(transcript_id), *(pdf_part_key(transcript_id, part) for part in range(parts)))
+
+
+@celery_app.task(bind=True)
+def convert_pdf(self, transcript_id: str, filename: str):
+    """Check the page limit and fan out page-range extraction."""
+    db: Session = SyncSessionLocal()
+    parts: list[bytes] = []
+    try:
+        transcript = db.query(Transcript).filter(Transcript.id == UUID(transcript_id)).first()
+        if not transcript:
+            logger.error(f"Transcript not found | transcript_id={transcript_id}")
+            return
+
+        transcript.status = TranscriptStatus.processing
+        transcript.task_id = self.request.id
+        db.commit()
+
+        pdf_bytes = _load_pdf(transcript_id)
+        pages = page_count(pdf_bytes)
+        if pages > settings.PDF_MAX_PAGES:
+            raise ValueError(f"PDF has {pages} pages; the limit is {settings.PDF_MAX_PAGES}")
+
+        publish_progress(transcript_id, "converting", {"pages": pages})
+        logger.info(f"Converting PDF | transcript_id={transcript_id} | pages={pages}")
+
+        # Split once: each range task then fetches and parses only its own pages
+        parts = split_pdf(pdf_bytes, settings.PDF_PAGES_PER_TASK)
+        pipe = get_redis().pipeline()
+        for part, part_bytes in enumerate(parts):
+            pipe.set(pdf_part_key(transcript_id, part), part_bytes, ex=settings.PDF_UPLOAD_TTL)
+        pipe.delete(pdf_upload_key(transcript_id))
+        pipe.execute()
+
+        callback = finalize_pdf.s(transcript_id, filename).on_error(
+            mark_transcript_failed.s(transcript_id=transcript_id)
+        )
+        chord(group(extract_pdf_pages.si(transcript_id, part) for part in range(len(parts))))(callback)
+
+    except Exception as e:
+        logger.exception(f"PDF conversion failed | transcript_id={transcript_id} | error={str(e)}")
+        _delete_pdf(transcript_id, len(parts))
+        try:
+            set_transcript_failed(db, transcript_id, str(e))
+        except Exception as rollback_err:
+            logger.error(f"Failed to rollback status | error={str(rollback_err)}")
+
+    finally:
+        db.close()
+
+
+@celery_app.task
+def extract_pdf_pages(transcript_id: str, part: int) -> list[str]:
+    """Markdown for the pages of one split part."""
+    return pages_to_markdown(_load_pdf(transcript_id, part))
+
+
+@celery_app.task(bind=True)
+def finalize_pdf(self, page_ranges: list[list[str]], transcript_id: str, filename: str):
+    """Chord callback: assemble pages in order, store raw_text, start processing."""
+    db: Session = SyncSessionLocal()
+    try:
+        transcript = db.query(Transcript).filter(Transcript.id == UUID(transcript_id)).first()
+        if not transcript:
+            logger.error(f"Transcript not found | transcript_id={transcript_id}")
+            return
+
+        pages = [page for pages_in_range in page_ranges for page in pages_in_range]
+        if not any(pages):
+            raise ValueError("No extractable text in PDF")
+        text = assemble_markdown(pages, filename)
+
+        transcript.raw_text = text
+        db.commit()
+        logger.info(f"PDF converted | transcript_id={transcript_id} | chars={len(text)}")
+
+        task = process_transcript.delay(transcript_id)
+        transcript.task_id = task.id
+        db.commit()
+
+    except Exception as e:
+        logger.exception(f"PDF finalize failed | transcript_id={transcript_id} | error={str(e)}")
+        try:
+            db.rollback()
+            set_transcript_failed(db, transcript_id, str(e))
+        except Exception as rollback_err:
+            logger.error(f"Failed to rollback status | error={str(rollback_err)}")
+
+    finally:
+        db.close()
+        # The parts are not needed after this point, whether finalizing worked or not
+        _delete_pdf(transcript_id, len(page_ranges))
@@ -0,0 +1,159 @@
+"""
+Redis-backed state shared by the transcript pipeline tasks.
+Chunks and per-chunk MAP results live in Redis so extraction tasks can run on
+any worker and a failed chunk can be retried without redoing the others.
+
+The state doubles as a checkpoint: MAP results are keyed by chunk content hash
+and the REDUCE output by a fingerprint of the whole chunk list, so a retried or
+reprocessed run skips every stage that already finished for the same text.
+
+MAP tasks of one transcript share LLM_MAX_CONCURRENCY slots (a leased Redis
+sorted set), so a large transcript cannot occupy every LLM call in the pool.
+"""
+import hashlib
+import json
+import time
+from typing import Optional
+
+from redis import Redis
+
+from app.ai.chains import ExtractedUseCase
+from app.ai.knowledge_base import content_hash
+from app.clients import get_redis
+from app.config import settings
+
+
+LLM_SLOT_LEASE = 10 * 60  # Seconds; a slot held by a lost worker frees itself after this
+
+# KEYS[1] slots zset; ARGV: now, lease expiry, limit, token, key ttl
+_ACQUIRE_SLOT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZSCORE', KEYS[1], ARGV[4]) == false
+    and redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+
+
+class PipelineStateMissing(RuntimeError):
+    """The pipeline state expired or was reset; retrying the task cannot help."""
+
+
+def chunks_fingerprint(chunks: list[str]) -> str:
+    """Identity of a chunk list; a REDUCE checkpoint is only valid for the same list."""
+    return hashlib.sha256("\n".join(content_hash(c) for c in chunks).encode("utf-8")).hexdigest()
+
+
+class TranscriptPipelineState:
+    """Chunks, MAP results and checkpoints of one transcript, expiring after PIPELINE_STATE_TTL."""
+
+    def __init__(self, transcript_id: str, redis_client: Optional[Redis] = None):
+        self.transcript_id = transcript_id
+        self.redis = redis_client or get_redis()
+        self.chunks_key = f"pipeline:{transcript_id}:chunks"
+        self.results_key = f"pipeline:{transcript_id}:map"
+        self.reduced_key = f"pipeline:{transcript_id}:reduced"
+        self.persisted_key = f"pipeline:{transcript_id}:persisted"
+        self.llm_slots_key = f"pipeline:{transcript_id}:llm"
+
+    def _keys(self) -> tuple[str, ...]:
+        return (self.chunks_key, self.results_key, self.reduced_key, self.persisted_key)
+
+    def set_chunks(self, chunks: list[str]):
+        """Replace the chunk list, keeping MAP results of chunks that did not change."""
+        stale = self.done_hashes() - {content_hash(chunk) for chunk in chunks}
+        pipe = self.redis.pipeline()
+        if stale:
+            pipe.hdel(self.results_key, *stale)
+        pipe.delete(self.chunks_key)
+        if chunks:
+            pipe.rpush(self.chunks_key, *chunks)
+        for key in self._keys():
+            pipe.expire(key, settings.PIPELINE_STATE_TTL)
+        pipe.execute()
+
+    def reset(self, chunks: list[str]):
+        """Start a fresh run: replace the chunk list and drop every checkpoint."""
+        self.redis.delete(*self._keys())
+        self.set_chunks(chunks)
+
+    def get_chunk(self, chunk_index: int) -> Optional[str]:
+        raw = self.redis.lindex(self.chunks_key, chunk_index)
+        return raw.decode("utf-8") if raw is not None else None
+
+    def get_chunks(self) -> list[str]:
+        return [raw.decode("utf-8") for raw in self.redis.lrange(self.chunks_key, 0, -1)]
+
+    # ── MAP checkpoints ───────────────────────────────────────────────────
+    def done_hashes(self) -> set[str]:
+        return {field.decode("utf-8") for field in self.redis.hkeys(self.results_key)}
+
+    def has_result(self, chunk: str) -> bool:
+        return bool(self.redis.hexists(self.results_key, content_hash(chunk)))
+
+    def store_result(self, chunk: str, use_cases: list[ExtractedUseCase]) -> int:
+        """Record a chunk's MAP result; returns the number of distinct chunks done so far."""
+        pipe = self.redis.pipeline()
+        pipe.hset(
+            self.results_key,
+            content_hash(chunk),
+            json.dumps([uc.model_dump(mode="json") for uc in use_cases]),
+        )
+        pipe.expire(self.results_key, settings.PIPELINE_STATE_TTL)
+        pipe.hlen(self.results_key)
+        return pipe.execute()[-1]
+
+    def load_results(self, chunks: list[str]) -> list[Optional[list[ExtractedUseCase]]]:
+        """MAP results in chunk order; None for chunks without a result."""
+        hashes = [content_hash(chunk) for chunk in chunks]
+        raws = self.redis.hmget(self.results_key, hashes) if hashes else []
+        return [
+            [ExtractedUseCase.model_validate(uc) for uc in json.loads(raw)] if raw is not None else None
+            for raw in raws
+        ]
+
+    # ── REDUCE / persist checkpoints ──────────────────────────────────────
+    def save_reduced(self, fingerprint: str, use_cases: list[dict]):
+        self.redis.set(
+            self.reduced_key,
+            json.dumps({"fingerprint": fingerprint, "use_cases": use_cases}),
+            ex=settings.PIPELINE_STATE_TTL,
+        )
+
+    def load_reduced(self, fingerprint: str) -> Optional[list[dict]]:
+        raw = self.redis.get(self.reduced_key)
+        if raw is None:
+            return None
+        checkpoint = json.loads(raw)
+        return checkpoint["use_cases"] if checkpoint.get("fingerprint") == fingerprint else None
+
+    def mark_persisted(self, fingerprint: str):
+        self.redis.set(self.persisted_key, fingerprint, ex=settings.PIPELINE_STATE_TTL)
+
+    def is_persisted(self, fingerprint: str) -> bool:
+        raw = self.redis.get(self.persisted_key)
+        return raw is not None and raw.decode("utf-8") == fingerprint
+
+    # ── LLM concurrency ───────────────────────────────────────────────────
+    def acquire_llm_slot(self, token: str) -> bool:
+        """Take one of LLM_MAX_CONCURRENCY slots for this transcript; False if all are held."""
+        now = time.time()
+        return bool(self.redis.eval(
+            _ACQUIRE_SLOT,
+            1,
+            self.llm_slots_key,
+            now,
+            now + LLM_SLOT_LEASE,
+            settings.LLM_MAX_CONCURRENCY,
+            token,
+            settings.PIPELINE_STATE_TTL,
+        ))
+
+    def release_llm_slot(self, token: str):
+        self.redis.zrem(self.llm_slots_key, token)
+
+    def clear(self):
+        self.redis.delete(*self._keys(), self.llm_slots_key)
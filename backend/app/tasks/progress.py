@@ -0,0 +1,172 @@
+"""
+Transcript progress events.
+
+Every event is appended to a capped per-transcript Redis Stream (progress:{id})
+for replay, then published on pub/sub (channel transcript:{id}) carrying the
+stream entry id so SSE clients can resume with Last-Event-ID. A "started"
+event begins a new run and discards the previous run's stream.
+
+High-frequency events (chunk_done, reducing) are coalesced per transcript:
+within PROGRESS_COALESCE_WINDOW only the latest one is published, and a
+trailing flush delivers it once the window closes. An event of a later stage
+(EVENT_STAGES) flushes pending events of earlier stages first; terminal events
+are always published immediately.
+
+Coalescing is per process, but the next stage may start in another worker, so
+every event records its stage in a Redis marker, atomically with the stream
+append. Coalesced events of an earlier stage that arrive after it (late
+trailing flushes elsewhere) are dropped, so the stream never moves backwards.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Optional
+
+from redis import Redis
+
+from app.clients import get_redis
+from app.config import settings
+from app.utils.sse import progress_channel, progress_stream_key
+
+logger = logging.getLogger(__name__)
+
+
+def progress_stage_key(transcript_id: str) -> str:
+    return f"progress:{transcript_id}:stage"
+
+
+COALESCED_EVENTS = frozenset({"chunk_done", "reducing"})
+TERMINAL_EVENTS = frozenset({"completed", "failed"})
+# Pipeline order; events not listed ("started", "converting") are stage 0
+EVENT_STAGES = {"chunk_done": 1, "reducing": 2, "completed": 3, "failed": 3}
+
+# KEYS: stage marker, stream. ARGV: stage, data, maxlen, ttl, coalesced, reset.
+# Returns the stream entry id, or nil when a coalesced event is older than the marker.
+_APPEND_EVENT = """
+if ARGV[6] == '1' then
+    redis.call('DEL', KEYS[1], KEYS[2])
+end
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local stage = tonumber(ARGV[1])
+if ARGV[5] == '1' and current > stage then
+    return nil
+end
+redis.call('SET', KEYS[1], math.max(current, stage), 'EX', ARGV[4])
+local id = redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*', 'data', ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return id
+"""
+
+
+class ProgressPublisher:
+    """Latest-wins coalescing publisher; safe to share between threads."""
+
+    def __init__(self, window: float, redis_client: Optional[Redis] = None):
+        self.window = window
+        self._redis = redis_client
+        self._lock = threading.Lock()
+        self._last_sent: dict[tuple[str, str], float] = {}
+        self._pending: dict[tuple[str, str], dict] = {}
+        self._timers: dict[tuple[str, str], threading.Timer] = {}
+
+    @property
+    def redis(self) -> Redis:
+        return self._redis or get_redis()
+
+    def _send(self, transcript_id: str, message: dict):
+        channel = progress_channel(transcript_id)
+        event = message["event"]
+        try:
+            stream_id = self.redis.eval(
+                _APPEND_EVENT,
+                2,
+                progress_stage_key(transcript_id),
+                progress_stream_key(transcript_id),
+                EVENT_STAGES.get(event, 0),
+                json.dumps(message),
+                settings.PROGRESS_STREAM_MAXLEN,
+                settings.PROGRESS_STREAM_TTL,
+                int(event in COALESCED_EVENTS),
+                int(event == "started"),
+            )
+            if stream_id is None:
+                return
+            self.redis.publish(channel, json.dumps({**message, "id": stream_id.decode("utf-8")}))
+        except Exception as e:
+            logger.error(f"Failed to publish to {channel}: {e}")
+
+    def publish(self, transcript_id: str, event_type: str, data: dict):
+        message = {"event": event_type, **data}
+        self._flush_earlier(transcript_id, EVENT_STAGES.get(event_type, 0))
+        if event_type in TERMINAL_EVENTS:
+            self._send(transcript_id, message)
+            self._forget(transcript_id)
+            return
+        if event_type not in COALESCED_EVENTS or self.window <= 0:
+            self._send(transcript_id, message)
+            return
+
+        key = (transcript_id, event_type)
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._pending and now - self._last_sent.get(key, 0.0) >= self.window:
+                self._last_sent[key] = now
+                send_now = True
+            else:
+                self._pending[key] = message
+                send_now = False
+                if key not in self._timers:
+                    delay = max(0.0, self.window - (now - self._last_sent.get(key, 0.0)))
+                    timer = threading.Timer(delay, self._flush_key, args=(key,))
+                    timer.daemon = True
+                    self._timers[key] = timer
+                    timer.start()
+        if send_now:
+            self._send(transcript_id, message)
+
+    def _flush_key(self, key: tuple[str, str]):
+        with self._lock:
+            message = self._pending.pop(key, None)
+            timer = self._timers.pop(key, None)
+            if message is not None:
+                self._last_sent[key] = time.monotonic()
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+        if message is not None:
+            self._send(key[0], message)
+
+    def flush(self, transcript_id: Optional[str] = None):
+        """Publish pending events now (for one transcript, or all)."""
+        with self._lock:
+            keys = [k for k in self._pending if transcript_id is None or k[0] == transcript_id]
+        for key in keys:
+            self._flush_key(key)
+
+    def _flush_earlier(self, transcript_id: str, stage: int):
+        """Publish pending events of stages before `stage`, so they never trail it."""
+        with self._lock:
+            keys = [k for k in self._pending if k[0] == transcript_id and EVENT_STAGES.get(k[1], 0) < stage]
+        for key in keys:
+            self._flush_key(key)
+
+    def _forget(self, transcript_id: str):
+        with self._lock:
+            for key in [k for k in self._last_sent if k[0] == transcript_id]:
+                del self._last_sent[key]
+
+
+_publisher: ProgressPublisher | None = None
+
+
+def get_progress_publisher() -> ProgressPublisher:
+    """Return the per-process progress publisher."""
+    global _publisher
+    if _publisher is None:
+        _publisher = ProgressPublisher(settings.PROGRESS_COALESCE_WINDOW)
+    return _publisher
+
+
+def publish_progress(transcript_id: str, event_type: str, data: dict):
+    """Publish progress events to Redis"""
+    get_progress_publisher().publish(transcript_id, event_type, data)
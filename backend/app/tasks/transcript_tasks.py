@@ -1,39 +1,61 @@
-import json
+"""
+Transcript processing pipeline:
+
+    process_transcript (chunk) → chord(extract_chunk × N) → reduce_transcript → persist_use_cases
+
+Chunks and per-chunk MAP results live in Redis (TranscriptPipelineState), so
+extraction fans out across the whole worker pool and a failing chunk is retried
+on its own. If a chunk exhausts its retries the chord errback marks the
+transcript failed.
+
+Runs resume by default: chunks whose MAP result is checkpointed are skipped, a
+finished MAP goes straight to REDUCE and a finished REDUCE straight to persist.
+"""
 import logging
+import random
 from uuid import UUID
+from celery import chord, group
+from celery.exceptions import Retry
+from celery.utils.time import get_exponential_backoff_interval
+from sqlalchemy import insert, update, func
 from sqlalchemy.orm import Session
-from redis import Redis
 from app.celery_app import celery_app
 from app.database import SyncSessionLocal
-from app.ai.chunker import chunk_transcript
-from app.ai.chains import create_extraction_chain, create_reduction_chain
+from app.ai.chunker import split_transcript
+from app.ai.chains import ExtractedUseCase, create_extraction_chain
+from app.ai.extraction_cache import get_cached_extractions, store_extraction
+from app.ai.reducer import reduce_use_cases
 from app.config import settings
 from app.models import Transcript, UseCase, Company
 from app.models.enums import TranscriptStatus, UseCaseStatus
-from app.ai.embedder import QdrantEmbedder
-from app.ai.knowledge_base import KnowledgeBase
+from app.ai.knowledge_base import KnowledgeBase, content_hash, use_case_metadata
+from app.tasks.progress import publish_progress
+from app.tasks.pipeline_state import PipelineStateMissing, TranscriptPipelineState, chunks_fingerprint
 
 logger = logging.getLogger(__name__)
 
+LLM_SLOT_POLL = 1.0  # Seconds before a chunk that found no free LLM slot is re-queued
+EXTRACT_RETRY_BACKOFF_MAX = 600  # Seconds; cap of the exponential backoff between failed extractions
 
-def publish_progress(transcript_id: str, event_type: str, data: dict):
-    """Publish progress events to Redis"""
-    redis_client = Redis.from_url(settings.REDIS_URL)
-    channel = f"transcript:{transcript_id}"
-    message = {"event": event_type, **data}
-    try:
-        redis_client.publish(channel, json.dumps(message))
-    except Exception as e:
-        logger.error(f"Failed to publish to {channel}: {e}")
+
+def set_transcript_failed(db: Session, transcript_id: str, error: str):
+    db.execute(
+        update(Transcript)
+        .where(Transcript.id == UUID(transcript_id))
+        .values(status=TranscriptStatus.failed, error_message=error)
+    )
+    db.commit()
+    publish_progress(transcript_id, "failed", {"error": error})
 
 
 @celery_app.task(bind=True)
-def process_transcript(self, transcript_id: str):
+def process_transcript(self, transcript_id: str, resume: bool = True):
     """
-    Process a transcript: chunk → map → reduce → persist → embed
+    Entry point: chunk the transcript, sync chunks to Qdrant, then fan out
+    extraction of the chunks that are neither checkpointed nor cached.
+    With resume=False every checkpoint of a previous run is discarded first.
     """
     db: Session = SyncSessionLocal()
-    embedder = QdrantEmbedder(settings.QDRANT_URL)
     kb = KnowledgeBase(settings.QDRANT_URL)
     task_id = self.request.id
 
@@ -60,91 +82,197 @@ def process_transcript(self, transcript_id: str):
 
         # ── Step 1: Chunking ───────────────────────────────────────────────
         logger.info(f"Starting chunking | transcript_id={transcript_id}")
-        chunks = chunk_transcript(transcript.raw_text)
+        transcript_chunks = split_transcript(transcript.raw_text)
+        chunks = [chunk.text for chunk in transcript_chunks]
         chunk_count = len(chunks)
 
         transcript.chunk_count = chunk_count
         db.commit()
         logger.info(f"Chunking completed | transcript_id={transcript_id} | chunks={chunk_count}")
 
-        # ── Step 1b: Upsert chunks to Qdrant knowledge base ─────────────────
-        # Delete existing chunks first (handles reprocess) then upsert
+        # ── Step 1b: Sync chunks to Qdrant knowledge base ───────────────────
+        # Content-addressed: on reprocess only changed chunks are embedded/written
         try:
-            kb.delete_transcript(transcript_id)
-            for idx, chunk in enumerate(chunks):
-                kb.upsert_transcript_chunk(
-                    transcript_id=transcript_id,
-                    company_id=str(transcript.company_id),
-                    chunk_index=idx,
-                    text=chunk,
-                )
-            logger.info(f"Knowledge base updated | transcript_id={transcript_id} | chunks={chunk_count}")
+            sync_stats = kb.sync_transcript_chunks(
+                transcript_id=transcript_id,
+                company_id=str(transcript.company_id),
+                chunks=chunks,
+                chunk_metadata=[chunk.metadata for chunk in transcript_chunks],
+            )
+            logger.info(f"Knowledge base updated | transcript_id={transcript_id} | chunks={chunk_count} | {sync_stats}")
         except Exception as e:
             logger.warning(f"Knowledge base upsert failed (non-fatal) | error={str(e)}")
 
+        # ── Step 2: Stage chunks, resume from checkpoints ─────────────────
+        state = TranscriptPipelineState(transcript_id)
+        if resume:
+            state.set_chunks(chunks)
+        else:
+            state.reset(chunks)
 
-        extraction_chain = create_extraction_chain()
-        all_use_cases = []
+        fingerprint = chunks_fingerprint(chunks)
+        if state.is_persisted(fingerprint) or state.load_reduced(fingerprint) is not None:
+            logger.info(f"Resuming after REDUCE | transcript_id={transcript_id}")
+            transcript.chunks_processed = chunk_count
+            db.commit()
+            persist_use_cases.delay(transcript_id)
+            return
 
-        for i, chunk in enumerate(chunks, 1):
-            try:
-                logger.debug(f"Processing chunk {i}/{chunk_count} | length={len(chunk)}")
+        done = state.done_hashes()
+        checkpointed = {idx for idx, chunk in enumerate(chunks) if content_hash(chunk) in done}
+        remaining = [idx for idx in range(chunk_count) if idx not in checkpointed]
+        cached = {
+            remaining[pos]: result
+            for pos, result in get_cached_extractions(db, [chunks[idx] for idx in remaining]).items()
+        }
+
+        processed = len({content_hash(chunks[idx]) for idx in checkpointed})
+        for idx, result in sorted(cached.items()):
+            processed = state.store_result(chunks[idx], result.use_cases)
+            publish_progress(
+                transcript_id,
+                "chunk_done",
+                {"chunk": idx + 1, "total": chunk_count, "processed": processed, "extracted": len(result.use_cases), "cached": True}
+            )
+        transcript.chunks_processed = processed
+        db.commit()
 
-                result = extraction_chain.invoke({"text": chunk})
-                extracted_count = len(result.use_cases)
-                all_use_cases.extend(result.use_cases)
+        # ── Step 3: Fan out MAP over the worker pool ───────────────────────
+        pending = [idx for idx in remaining if idx not in cached]
+        logger.info(
+            f"Dispatching MAP | transcript_id={transcript_id} | chunks={chunk_count} | "
+            f"resumed={len(checkpointed)} | cached={len(cached)} | pending={len(pending)}"
+        )
 
-                publish_progress(
-                    transcript_id,
-                    "chunk_done",
-                    {"chunk": i, "total": chunk_count, "extracted": extracted_count}
-                )
+        if pending:
+            callback = reduce_transcript.si(transcript_id).on_error(
+                mark_transcript_failed.s(transcript_id=transcript_id)
+            )
+            chord(group(extract_chunk.si(transcript_id, idx) for idx in pending))(callback)
+        else:
+            # MAP already complete – go straight to REDUCE
+            reduce_transcript.delay(transcript_id)
 
-                transcript.chunks_processed = i
-                db.commit()
+    except Exception as e:
+        logger.exception(f"Critical task failure | transcript_id={transcript_id} | error={str(e)}")
+        try:
+            set_transcript_failed(db, transcript_id, str(e))
+        except Exception as rollback_err:
+            logger.error(f"Failed to rollback status | error={str(rollback_err)}")
 
-                logger.info(f"Chunk processed | transcript_id={transcript_id} | chunk={i}/{chunk_count} | extracted={extracted_count}")
+    finally:
+        db.close()
+        logger.debug(f"Database session closed | transcript_id={transcript_id}")
 
-            except Exception as e:
-                logger.exception(f"MAP failed on chunk {i}/{chunk_count} | error={str(e)}")
-                publish_progress(transcript_id, "failed", {"error": str(e)})
-                transcript.status = TranscriptStatus.failed
-                transcript.error_message = str(e)
-                db.commit()
-                return
 
+@celery_app.task(bind=True, acks_late=True, reject_on_worker_lost=True, max_retries=None)
+def extract_chunk(self, transcript_id: str, chunk_index: int, slot_waits: int = 0):
+    """
+    MAP one chunk; the result is checkpointed in Redis and the extraction cache.
+    Waiting for an LLM slot re-queues the task instead of holding the worker;
+    those re-queues (slot_waits) do not count against EXTRACT_CHUNK_MAX_RETRIES.
+    """
+    try:
+        return _extract_chunk(self, transcript_id, chunk_index, slot_waits)
+    except (Retry, PipelineStateMissing):
+        raise
+    except Exception as e:
+        failures = self.request.retries - slot_waits
+        if failures >= settings.EXTRACT_CHUNK_MAX_RETRIES:
+            raise
+        countdown = get_exponential_backoff_interval(1, failures, EXTRACT_RETRY_BACKOFF_MAX, full_jitter=True)
+        logger.warning(f"Chunk extraction failed, retrying | transcript_id={transcript_id} | chunk={chunk_index + 1} | error={e}")
+        raise self.retry(exc=e, countdown=countdown)
+
+
+def _extract_chunk(task, transcript_id: str, chunk_index: int, slot_waits: int):
+    state = TranscriptPipelineState(transcript_id)
+    chunk = state.get_chunk(chunk_index)
+    if chunk is None:
+        raise PipelineStateMissing(f"Chunk {chunk_index} missing from pipeline state (expired or reset)")
+    if state.has_result(chunk):
+        # Redelivered after a worker loss, or a duplicate chunk already done
+        logger.info(f"Chunk already checkpointed | transcript_id={transcript_id} | chunk={chunk_index + 1}")
+        return None
+
+    # At most LLM_MAX_CONCURRENCY chunks of this transcript call the LLM at once
+    token = task.request.id or f"{transcript_id}:{chunk_index}"
+    if not state.acquire_llm_slot(token):
+        raise task.retry(
+            args=(transcript_id, chunk_index),
+            kwargs={"slot_waits": slot_waits + 1},
+            countdown=LLM_SLOT_POLL * (1 + random.random()),
+        )
+    try:
+        result = create_extraction_chain().invoke({"text": chunk})
+    finally:
+        state.release_llm_slot(token)
+    processed = state.store_result(chunk, result.use_cases)
+
+    db: Session = SyncSessionLocal()
+    try:
+        try:
+            store_extraction(db, chunk, result)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Extraction cache write failed (non-fatal) | error={str(e)}")
+        # Completion order is arbitrary and tasks may retry; never move the counter backwards
+        transcript = db.execute(
+            update(Transcript)
+            .where(Transcript.id == UUID(transcript_id))
+            .values(chunks_processed=func.greatest(func.coalesce(Transcript.chunks_processed, 0), processed))
+            .returning(Transcript.chunk_count)
+        ).first()
+        db.commit()
+    finally:
+        db.close()
+
+    chunk_count = transcript.chunk_count if transcript else None
+    publish_progress(
+        transcript_id,
+        "chunk_done",
+        {"chunk": chunk_index + 1, "total": chunk_count, "processed": processed, "extracted": len(result.use_cases)}
+    )
+    logger.info(f"Chunk processed | transcript_id={transcript_id} | chunk={chunk_index + 1}/{chunk_count} | extracted={len(result.use_cases)}")
+    return len(result.use_cases)
+
+
+@celery_app.task(bind=True)
+def reduce_transcript(self, transcript_id: str):
+    """Chord callback: merge all MAP results in chunk order and hand off to persistence."""
+    db: Session = SyncSessionLocal()
+    kb = KnowledgeBase(settings.QDRANT_URL)
+    try:
+        transcript = db.query(Transcript).filter(Transcript.id == UUID(transcript_id)).first()
+        if not transcript:
+            logger.error(f"Transcript not found | transcript_id={transcript_id}")
+            return
+
+        state = TranscriptPipelineState(transcript_id)
+        chunks = state.get_chunks()
+        if not chunks and transcript.chunk_count:
+            # Expired or reset: reducing nothing would complete the transcript with 0 use cases
+            raise PipelineStateMissing(f"Pipeline state for {transcript.chunk_count} chunks missing (expired or reset)")
+        results = state.load_results(chunks)
+        missing = [i + 1 for i, r in enumerate(results) if r is None]
+        if missing:
+            raise RuntimeError(f"MAP results missing for chunks {missing}")
+
+        # Merge in chunk order regardless of completion order
+        all_use_cases = [uc for chunk_use_cases in results for uc in chunk_use_cases]
         logger.info(f"MAP phase completed | transcript_id={transcript_id} | raw_use_cases={len(all_use_cases)}")
 
-        # ── Step 3: REDUCE – moving window deduplicate & merge ───────────────
+        # ── REDUCE – deduplicate & merge (tree or moving window) ───────────
         publish_progress(transcript_id, "reducing", {"raw_count": len(all_use_cases)})
-        logger.info(f"Starting REDUCE phase | raw_count={len(all_use_cases)}")
-
-        REDUCE_BATCH_SIZE = 15  # Process in batches to keep context manageable
-        reduction_chain = create_reduction_chain()
-        accumulated: list = []
-        already_extracted_str = ""
+        logger.info(f"Starting REDUCE phase | raw_count={len(all_use_cases)} | strategy={settings.REDUCE_STRATEGY}")
 
         if all_use_cases:
             try:
-                for i in range(0, len(all_use_cases), REDUCE_BATCH_SIZE):
-                    batch = all_use_cases[i : i + REDUCE_BATCH_SIZE]
-                    batch_json = json.dumps([uc.dict() for uc in batch], default=str)
-                    reduced_result = reduction_chain.invoke({
-                        "text": batch_json,
-                        "already_extracted": already_extracted_str or "(none yet)",
-                    })
-                    new_ucs = reduced_result.use_cases
-                    accumulated.extend(new_ucs)
-                    already_extracted_str = json.dumps(
-                        [{"title": u.title, "description": u.description[:200]} for u in accumulated],
-                        default=str,
-                    )
-                    publish_progress(
-                        transcript_id,
-                        "reducing",
-                        {"batch": i // REDUCE_BATCH_SIZE + 1, "accumulated": len(accumulated)},
-                    )
-                final_use_cases = accumulated
+                final_use_cases = reduce_use_cases(
+                    all_use_cases,
+                    on_progress=lambda data: publish_progress(transcript_id, "reducing", data),
+                    embed_batch=kb.embed_batch,
+                )
                 logger.info(f"REDUCE completed | before={len(all_use_cases)} → after={len(final_use_cases)}")
             except Exception as e:
                 logger.exception(f"REDUCE failed – falling back to raw results | error={str(e)}")
@@ -153,69 +281,149 @@ def process_transcript(self, transcript_id: str):
             final_use_cases = []
             logger.info("No use cases to reduce – empty result")
 
-        # ── Step 4: Persist to DB ──────────────────────────────────────────
+        state.save_reduced(chunks_fingerprint(chunks), [uc.model_dump(mode="json") for uc in final_use_cases])
+        persist_use_cases.delay(transcript_id)
+
+    except Exception as e:
+        logger.exception(f"REDUCE task failure | transcript_id={transcript_id} | error={str(e)}")
+        try:
+            set_transcript_failed(db, transcript_id, str(e))
+        except Exception as rollback_err:
+            logger.error(f"Failed to rollback status | error={str(rollback_err)}")
+
+    finally:
+        db.close()
+
+
+def _bulk_insert_use_cases(db: Session, rows: list[dict]) -> list[tuple[UUID, dict]]:
+    """
+    Insert all rows with one multi-row INSERT ... RETURNING id inside a savepoint.
+    If that fails, retry row by row, each in its own savepoint, so a bad row is
+    skipped without losing the others. Returns (id, row) for every inserted row.
+    """
+    if not rows:
+        return []
+    stmt = insert(UseCase).returning(UseCase.id, sort_by_parameter_order=True)
+    try:
+        with db.begin_nested():
+            ids = db.scalars(stmt, rows).all()
+        return list(zip(ids, rows))
+    except Exception as e:
+        logger.warning(f"Bulk use case insert failed, isolating rows | count={len(rows)} | error={str(e)}")
+
+    inserted: list[tuple[UUID, dict]] = []
+    for row in rows:
+        try:
+            with db.begin_nested():
+                inserted.append((db.scalars(stmt, [row]).one(), row))
+        except Exception as e:
+            logger.exception(f"Failed to persist use case | title={row['title'][:80]} | error={str(e)}")
+    return inserted
+
+
+def _finalize(db: Session, transcript: Transcript, state: TranscriptPipelineState, transcript_id: str, use_cases_count: int | None):
+    transcript.status = TranscriptStatus.completed
+    db.commit()
+    state.clear()
+
+    if use_cases_count is None:
+        use_cases_count = db.query(func.count(UseCase.id)).filter(UseCase.transcript_id == transcript.id).scalar()
+    publish_progress(
+        transcript_id,
+        "completed",
+        {"use_cases_count": use_cases_count}
+    )
+    logger.info(f"Transcript processing finished successfully | transcript_id={transcript_id} | use_cases={use_cases_count}")
+
+
+@celery_app.task(bind=True)
+def persist_use_cases(self, transcript_id: str):
+    """Write the checkpointed REDUCE output to Postgres and Qdrant, then complete the transcript."""
+    db: Session = SyncSessionLocal()
+    kb = KnowledgeBase(settings.QDRANT_URL)
+    try:
+        transcript = db.query(Transcript).filter(Transcript.id == UUID(transcript_id)).first()
+        if not transcript:
+            logger.error(f"Transcript not found | transcript_id={transcript_id}")
+            return
+
+        state = TranscriptPipelineState(transcript_id)
+        fingerprint = chunks_fingerprint(state.get_chunks())
+        if state.is_persisted(fingerprint):
+            # Use cases were written by an earlier attempt; only finalize
+            _finalize(db, transcript, state, transcript_id, None)
+            return
+        use_cases = state.load_reduced(fingerprint)
+        if use_cases is None:
+            raise RuntimeError("REDUCE checkpoint missing (expired or reset)")
+        final_use_cases = [ExtractedUseCase.model_validate(uc) for uc in use_cases]
+
+        # ── Persist to DB ──────────────────────────────────────────────────
         logger.info(f"Starting persistence | use_cases_count={len(final_use_cases)}")
 
         company = db.query(Company).filter(Company.id == transcript.company_id).first()
         if not company:
             logger.error(f"Company not found | company_id={transcript.company_id}")
 
-        persisted_count = 0
-        for uc_data in final_use_cases:
-            try:
-                new_uc = UseCase(
-                    title=uc_data.title,
-                    description=uc_data.description,
-                    expected_benefit=uc_data.expected_benefit,
-                    tags=uc_data.tags,
-                    confidence_score=uc_data.confidence_score,
-                    status=UseCaseStatus.new,
-                    company_id=transcript.company_id,
-                    transcript_id=UUID(transcript_id),
-                    created_by_id=transcript.uploaded_by_id,
-                )
-                db.add(new_uc)
-                db.flush()
-
-                try:
-                    kb.upsert_use_case(
-                        use_case_id=str(new_uc.id),
-                        company_id=str(transcript.company_id),
-                        title=uc_data.title,
-                        description=uc_data.description,
-                    )
-                except Exception as emb_err:
-                    logger.warning(f"Use case embedding failed (non-fatal) | id={new_uc.id} | error={str(emb_err)}")
-
-                persisted_count += 1
-
-            except Exception as e:
-                logger.exception(f"Failed to persist use case | title={uc_data.title[:80]} | error={str(e)}")
+        rows = [
+            {
+                "title": uc_data.title,
+                "description": uc_data.description,
+                "expected_benefit": uc_data.expected_benefit,
+                "tags": uc_data.tags,
+                "confidence_score": uc_data.confidence_score,
+                "status": UseCaseStatus.new,
+                "company_id": transcript.company_id,
+                "transcript_id": UUID(transcript_id),
+                "created_by_id": transcript.uploaded_by_id,
+            }
+            for uc_data in final_use_cases
+        ]
+        inserted = _bulk_insert_use_cases(db, rows)
+        persisted_count = len(inserted)
+        kb_items = [
+            {
+                "use_case_id": str(use_case_id),
+                "company_id": str(transcript.company_id),
+                "title": row["title"],
+                "description": row["description"],
+                "metadata": use_case_metadata(
+                    row["status"], row["tags"], row["confidence_score"], company.industry_id if company else None
+                ),
+            }
+            for use_case_id, row in inserted
+        ]
 
         db.commit()
+        state.mark_persisted(fingerprint)
         logger.info(f"Persistence completed | persisted={persisted_count}/{len(final_use_cases)}")
 
-        # ── Finalize ───────────────────────────────────────────────────────
-        transcript.status = TranscriptStatus.completed
-        db.commit()
+        try:
+            kb.upsert_use_cases(kb_items)
+        except Exception as emb_err:
+            logger.warning(f"Use case embedding failed (non-fatal) | count={len(kb_items)} | error={str(emb_err)}")
 
-        publish_progress(
-            transcript_id,
-            "completed",
-            {"use_cases_count": len(final_use_cases)}
-        )
-        logger.info(f"Transcript processing finished successfully | transcript_id={transcript_id} | use_cases={len(final_use_cases)}")
+        _finalize(db, transcript, state, transcript_id, len(final_use_cases))
 
     except Exception as e:
-        logger.exception(f"Critical task failure | transcript_id={transcript_id} | error={str(e)}")
+        logger.exception(f"Persist task failure | transcript_id={transcript_id} | error={str(e)}")
         try:
-            transcript.status = TranscriptStatus.failed
-            transcript.error_message = str(e)
-            db.commit()
-            publish_progress(transcript_id, "failed", {"error": str(e)})
+            db.rollback()
+            set_transcript_failed(db, transcript_id, str(e))
         except Exception as rollback_err:
             logger.error(f"Failed to rollback status | error={str(rollback_err)}")
 
     finally:
         db.close()
-        logger.debug(f"Database session closed | transcript_id={transcript_id}")
\ No newline at end of file
+        logger.debug(f"Database session closed | transcript_id={transcript_id}")
+
+
+@celery_app.task
+def mark_transcript_failed(request, exc, traceback, transcript_id: str):
+    """Chord errback: a chunk exhausted its retries, so the transcript cannot complete."""
+    logger.error(f"Transcript pipeline failed | transcript_id={transcript_id} | task_id={request.id} | error={exc}")
+    db: Session = SyncSessionLocal()
+    try:
+        set_transcript_failed(db, transcript_id, str(exc))
+    finally:
+        db.close()
@@ -1,29 +1,229 @@
+"""
+Server-Sent Events for transcript progress.
+
+One redis.asyncio pattern subscription (transcript:*) per API process fans
+messages out to in-memory queues, one per open SSE stream, so viewers neither
+block the event loop nor hold their own Redis connection.
+
+Events are also kept in a capped per-transcript Redis Stream and sent with
+their stream id, so a reconnecting client (Last-Event-ID) gets the missed
+events replayed and a late client still sees how the run ended.
+"""
+import asyncio
 import json
-from typing import AsyncGenerator
-from redis import Redis
+import logging
+from typing import AsyncGenerator, Optional
+
+from redis import asyncio as aioredis
+
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "transcript:"
+TERMINAL_EVENTS = ("completed", "failed")
+QUEUE_MAX_SIZE = 256
+RECONNECT_DELAY = 1.0
+
+
+def progress_channel(transcript_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{transcript_id}"
+
+
+def progress_stream_key(transcript_id: str) -> str:
+    return f"progress:{transcript_id}"
+
+
+def _stream_id_key(stream_id: Optional[str]) -> Optional[tuple[int, int]]:
+    """Sortable form of a Redis stream id ("<ms>-<seq>"); None if malformed."""
+    try:
+        ms, _, seq = stream_id.partition("-")
+        return int(ms), int(seq or 0)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _format_event(data: dict, event_id: Optional[str] = None) -> str:
+    prefix = f"id: {event_id}\n" if event_id else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+class ProgressBroadcaster:
+    """Shared psubscribe reader; started lazily on the first subscriber."""
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._redis: aioredis.Redis | None = None
+        self._pubsub = None
+        self._reader: asyncio.Task | None = None
+        self._start_lock = asyncio.Lock()
+        self._queues: dict[str, set[asyncio.Queue]] = {}
+
+    async def _connect(self):
+        self._redis = aioredis.Redis.from_url(self.redis_url)
+        self._pubsub = self._redis.pubsub()
+        await self._pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
 
-async def subscribe_to_transcript_progress(transcript_id: str) -> AsyncGenerator[str, None]:
+    async def _disconnect(self):
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                pass
+        self._pubsub = None
+        self._redis = None
+
+    async def _ensure_started(self):
+        if self._reader is not None and not self._reader.done():
+            return
+        async with self._start_lock:
+            if self._reader is not None and not self._reader.done():
+                return
+            await self._connect()
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Progress subscriber lost Redis connection, reconnecting | error={e}")
+                await self._disconnect()
+                await asyncio.sleep(RECONNECT_DELAY)
+                try:
+                    await self._connect()
+                except Exception as connect_err:
+                    logger.error(f"Progress subscriber reconnect failed | error={connect_err}")
+
+    def _dispatch(self, channel: bytes | str, data: bytes | str):
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8")
+        queues = self._queues.get(channel[len(CHANNEL_PREFIX):])
+        if not queues:
+            return
+        try:
+            payload = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Dropping malformed progress message | channel={channel}")
+            return
+        for queue in queues:
+            if queue.full():
+                # Slow consumer: drop the oldest event, progress payloads are cumulative
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    async def subscribe(self, transcript_id: str) -> asyncio.Queue:
+        await self._ensure_started()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAX_SIZE)
+        self._queues.setdefault(transcript_id, set()).add(queue)
+        return queue
+
+    async def replay(self, transcript_id: str, after: Optional[str] = None) -> list[tuple[str, dict]]:
+        """Stream entries after the given id (all when None) as (id, payload)."""
+        await self._ensure_started()
+        try:
+            entries = await self._redis.xrange(
+                progress_stream_key(transcript_id),
+                min=f"({after}" if after else "-",
+                max="+",
+            )
+        except Exception as e:
+            logger.warning(f"Progress replay failed | transcript_id={transcript_id} | error={e}")
+            return []
+        return [
+            (entry_id.decode("utf-8"), json.loads(fields[b"data"]))
+            for entry_id, fields in entries
+        ]
+
+    def unsubscribe(self, transcript_id: str, queue: asyncio.Queue):
+        queues = self._queues.get(transcript_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._queues[transcript_id]
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader = None
+        await self._disconnect()
+        self._queues.clear()
+
+
+_broadcaster: ProgressBroadcaster | None = None
+
+
+def get_progress_broadcaster() -> ProgressBroadcaster:
+    """Return the per-process progress broadcaster."""
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = ProgressBroadcaster(settings.REDIS_URL)
+    return _broadcaster
+
+
+async def subscribe_to_transcript_progress(
+    transcript_id: str,
+    last_event_id: Optional[str] = None,
+    terminal_event: Optional[dict] = None,
+) -> AsyncGenerator[str, None]:
     """
     Subscribe to transcript processing progress via Server-Sent Events.
-    Yields SSE-formatted messages until completion or failure.
+    Replays stream events after last_event_id, then yields live messages until
+    completion or failure, with a comment line every SSE_HEARTBEAT_INTERVAL
+    seconds to keep proxies from timing out. terminal_event is the final event
+    for a transcript that already finished; it is sent (and the stream closed)
+    if the replay does not end the run by itself.
     """
-    redis_client = Redis.from_url(settings.REDIS_URL)
-    pubsub = redis_client.pubsub()
-    channel = f"transcript:{transcript_id}"
-    
+    broadcaster = get_progress_broadcaster()
+    # Subscribe before replaying so nothing published in between is lost
+    queue = await broadcaster.subscribe(transcript_id)
     try:
-        pubsub.subscribe(channel)
-        
-        for message in pubsub.listen():
-            if message["type"] == "message":
-                data = json.loads(message["data"])
-                yield f"data: {json.dumps(data)}\n\n"
-                
-                # Close connection on completion or failure
-                if data.get("event") in ("completed", "failed"):
-                    break
+        last_seen = _stream_id_key(last_event_id)
+        for event_id, data in await broadcaster.replay(transcript_id, last_event_id if last_seen else None):
+            last_seen = _stream_id_key(event_id)
+            yield _format_event(data, event_id)
+            if data.get("event") in TERMINAL_EVENTS:
+                return
+
+        if terminal_event is not None:
+            yield _format_event(terminal_event)
+            return
+
+        while True:
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=settings.SSE_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+
+            # The payload dict is shared by every subscriber queue: read, don't mutate
+            event_id = data.get("id")
+            data = {key: value for key, value in data.items() if key != "id"}
+            event_key = _stream_id_key(event_id)
+            if event_key is not None and last_seen is not None and event_key <= last_seen:
+                continue  # Already sent during replay
+            if event_key is not None:
+                last_seen = event_key
+            yield _format_event(data, event_id)
+
+            # Close connection on completion or failure
+            if data.get("event") in TERMINAL_EVENTS:
+                break
     finally:
-        pubsub.unsubscribe(channel)
-        pubsub.close()
+        # Runs on normal completion and when the client disconnects (generator cancelled)
+        broadcaster.unsubscribe(transcript_id, queue)
@@ -0,0 +1,55 @@
+import json
+from types import SimpleNamespace
+
+from app.ai import reducer
+from app.ai.chains import ExtractedUseCase
+
+
+class FakeReductionChain:
+    """Merges by exact title, like the REDUCE prompt does by meaning, and records each prompt."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def _reduce(self, inputs: dict):
+        self.prompts.append(inputs)
+        already = inputs["already_extracted"]
+        seen = {u["title"] for u in json.loads(already)} if already != "(none yet)" else set()
+        use_cases = []
+        for raw in json.loads(inputs["text"]):
+            if raw["title"] not in seen:
+                seen.add(raw["title"])
+                use_cases.append(ExtractedUseCase(**raw))
+        return SimpleNamespace(use_cases=use_cases)
+
+    def invoke(self, inputs: dict):
+        return self._reduce(inputs)
+
+    def batch(self, inputs: list[dict], config=None):
+        return [self._reduce(i) for i in inputs]
+
+
+def _use_cases(count: int, distinct: int) -> list[ExtractedUseCase]:
+    # Title k recurs every `distinct` items, so each title's copies land in different batches
+    return [ExtractedUseCase(title=f"Use case {i % distinct}", description=f"Mention {i}") for i in range(count)]
+
+
+def test_tree_reduce_merges_duplicates_across_batches(monkeypatch):
+    chain = FakeReductionChain()
+    monkeypatch.setattr(reducer, "create_reduction_chain", lambda: chain)
+
+    result = reducer.tree_reduce(_use_cases(150, 39), batch_size=15, fan_in=4, max_depth=4)
+
+    assert sorted(u.title for u in result) == sorted(f"Use case {k}" for k in range(39))
+    assert all(len(json.loads(p["text"])) <= 15 for p in chain.prompts)
+
+
+def test_tree_reduce_skips_groups_from_a_single_output(monkeypatch):
+    chain = FakeReductionChain()
+    monkeypatch.setattr(reducer, "create_reduction_chain", lambda: chain)
+
+    result = reducer.tree_reduce(_use_cases(150, 150), batch_size=15, fan_in=4, max_depth=4)
+
+    assert len(result) == 150
+    # Ten first-level batches, then one global pass with a call per output after the first
+    assert len(chain.prompts) == 10 + 9